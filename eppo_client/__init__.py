@@ -6,7 +6,8 @@ from eppo_client.configuration_requestor import (
 )
 from eppo_client.configuration_store import ConfigurationStore
 from eppo_client.http_client import HttpClient, SdkParams
-from eppo_client.models import BanditData, Flag
+from eppo_client.eval import CompiledFlag
+from eppo_client.bandit import CompiledBandit
 from eppo_client.read_write_lock import ReadWriteLock
 from eppo_client.version import __version__
 
@@ -33,19 +34,17 @@ def init(config: Config) -> EppoClient:
         apiKey=config.api_key, sdkName="python", sdkVersion=__version__
     )
     http_client = HttpClient(base_url=config.base_url, sdk_params=sdk_params)
-    flag_config_store: ConfigurationStore[Flag] = ConfigurationStore()
-    bandit_config_store: ConfigurationStore[BanditData] = ConfigurationStore()
-
-    if config.initial_configuration:
-        flag_config_store.set_configurations(
-            config.initial_configuration._flags_configuration.flags
-        )
+    flag_config_store: ConfigurationStore[CompiledFlag] = ConfigurationStore()
+    bandit_config_store: ConfigurationStore[CompiledBandit] = ConfigurationStore()
 
     config_requestor = ExperimentConfigurationRequestor(
         http_client=http_client,
         flag_config_store=flag_config_store,
         bandit_config_store=bandit_config_store,
     )
+    if config.initial_configuration:
+        config_requestor._set_configuration(config.initial_configuration)
+
     assignment_logger = config.assignment_logger
     is_graceful_mode = config.is_graceful_mode
     global __client
@@ -60,6 +59,10 @@ def init(config: Config) -> EppoClient:
             poll_interval_seconds=config.poll_interval_seconds,
             poll_jitter_seconds=config.poll_jitter_seconds,
             is_graceful_mode=is_graceful_mode,
+            evaluation_cache=config.evaluation_cache,
+            json_assignment_views=config.json_assignment_views,
+            diagnostics_interval_seconds=config.diagnostics_interval_seconds,
+            bandit_score_cache=config.bandit_score_cache,
         )
         return __client
 
@@ -0,0 +1,268 @@
+import math
+import numbers
+from bisect import bisect_left
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from eppo_client.rules import OperatorType, Rule, subject_string
+from eppo_client.types import AttributeType
+
+# Flags with fewer allocations are cheaper to scan than to index.
+MIN_ALLOCATIONS_TO_INDEX = 8
+
+
+class AllocationIndex:
+    """
+    Narrows down which allocations of a flag a subject can possibly match.
+
+    An allocation whose every rule requires ``attribute ONE_OF [...]`` can only
+    match subjects whose attribute value is in one of those lists, so it is
+    filed under those values. Otherwise, an allocation whose every rule bounds
+    a numeric attribute with GT/GTE/LT/LTE is filed under the intervals those
+    bounds describe. Remaining allocations are always candidates.
+
+    Candidates are returned as positions in allocation order, which keeps
+    first-match-wins semantics; their rules still need to be evaluated.
+    """
+
+    __slots__ = (
+        "__all_positions",
+        "__unindexed",
+        "__value_indexes",
+        "__range_indexes",
+    )
+
+    def __init__(self, allocation_rules: Sequence[Sequence[Rule]]):
+        self.__all_positions = tuple(range(len(allocation_rules)))
+        self.__unindexed: List[int] = []
+        self.__value_indexes: Dict[str, Dict[str, List[int]]] = {}
+        self.__range_indexes: Dict[str, RangeIndex] = {}
+
+        if len(allocation_rules) < MIN_ALLOCATIONS_TO_INDEX:
+            return
+
+        intervals_by_attribute: Dict[str, List[Tuple[int, List[Interval]]]] = {}
+        for position, rules in enumerate(allocation_rules):
+            equality_keys = _equality_keys(rules)
+            if equality_keys is not None:
+                attribute, keys = equality_keys
+                value_index = self.__value_indexes.setdefault(attribute, {})
+                for key in keys:
+                    value_index.setdefault(key, []).append(position)
+                continue
+
+            numeric_intervals = _numeric_intervals(rules)
+            if numeric_intervals is not None:
+                attribute, intervals = numeric_intervals
+                intervals_by_attribute.setdefault(attribute, []).append(
+                    (position, intervals)
+                )
+                continue
+
+            self.__unindexed.append(position)
+
+        for attribute, allocation_intervals in intervals_by_attribute.items():
+            self.__range_indexes[attribute] = RangeIndex(allocation_intervals)
+
+    def candidates(
+        self, subject_attributes: Mapping[str, AttributeType]
+    ) -> Sequence[int]:
+        if not self.__value_indexes and not self.__range_indexes:
+            return self.__all_positions
+
+        positions = list(self.__unindexed)
+        for attribute, value_index in self.__value_indexes.items():
+            key = subject_string(subject_attributes, attribute)
+            if key is not None:
+                positions.extend(value_index.get(key, ()))
+        for attribute, range_index in self.__range_indexes.items():
+            subject_value = subject_attributes.get(attribute)
+            positions.extend(range_index.find(subject_value))
+        # an allocation is filed under a single attribute so there are no duplicates
+        positions.sort()
+        return positions
+
+
+class Interval(NamedTuple):
+    lower: Any
+    lower_inclusive: bool
+    upper: Any
+    upper_inclusive: bool
+
+
+class RangeIndex:
+    """
+    Maps a numeric value to the allocations whose intervals contain it.
+
+    The distinct interval bounds b0 < b1 < ... < bk-1 split the number line into
+    2k + 1 regions: (-inf, b0), [b0], (b0, b1), [b1], ..., (bk-1, inf). Every
+    region is covered entirely or not at all by each interval, so the
+    allocations of each region are computed once and looked up by bisection.
+    """
+
+    __slots__ = ("__bounds", "__regions")
+
+    def __init__(self, allocation_intervals: List[Tuple[int, List[Interval]]]):
+        bounds: Set[Any] = set()
+        for _, intervals in allocation_intervals:
+            for interval in intervals:
+                bounds.update((interval.lower, interval.upper))
+        self.__bounds = sorted(bound for bound in bounds if not math.isinf(bound))
+
+        regions: List[List[int]] = [[] for _ in range(2 * len(self.__bounds) + 1)]
+        for position, intervals in allocation_intervals:
+            covered: Set[int] = set()
+            for interval in intervals:
+                covered.update(range(*self.__regions_of(interval)))
+            for region in covered:
+                regions[region].append(position)
+        # positions were added in allocation order
+        self.__regions = [tuple(positions) for positions in regions]
+
+    def find(self, value: AttributeType) -> Tuple[int, ...]:
+        # numeric conditions never hold for non-numbers, nor for NaN
+        if not isinstance(value, numbers.Number) or value != value:
+            return ()
+        return self.__regions[self.__region_of(value)]
+
+    def __region_of(self, value: Any) -> int:
+        i = bisect_left(self.__bounds, value)
+        if i < len(self.__bounds) and self.__bounds[i] == value:
+            return 2 * i + 1
+        return 2 * i
+
+    def __regions_of(self, interval: Interval) -> Tuple[int, int]:
+        """Returns the half-open range of regions covered by the interval."""
+        if math.isinf(interval.lower):
+            start = 0
+        else:
+            start = self.__region_of(interval.lower)
+            if not interval.lower_inclusive:
+                start += 1
+        if math.isinf(interval.upper):
+            stop = 2 * len(self.__bounds) + 1
+        else:
+            stop = self.__region_of(interval.upper)
+            if interval.upper_inclusive:
+                stop += 1
+        return start, max(start, stop)
+
+
+def _equality_keys(rules: Sequence[Rule]) -> Optional[Tuple[str, FrozenSet[str]]]:
+    """
+    Returns the most selective attribute that every rule restricts with ONE_OF,
+    together with all the values that can satisfy those rules.
+    """
+    if not rules:
+        return None
+
+    keys_by_attribute: Optional[Dict[str, FrozenSet[str]]] = None
+    for rule in rules:
+        rule_keys: Dict[str, FrozenSet[str]] = {}
+        for condition in rule.conditions:
+            if condition.operator != OperatorType.ONE_OF:
+                continue
+            values = (
+                frozenset(str(value) for value in condition.value)
+                if isinstance(condition.value, list)
+                else frozenset()
+            )
+            # all conditions of a rule must hold
+            previous = rule_keys.get(condition.attribute)
+            rule_keys[condition.attribute] = (
+                values if previous is None else previous & values
+            )
+
+        if keys_by_attribute is None:
+            keys_by_attribute = rule_keys
+        else:
+            # any rule may match
+            keys_by_attribute = {
+                attribute: keys | rule_keys[attribute]
+                for attribute, keys in keys_by_attribute.items()
+                if attribute in rule_keys
+            }
+        if not keys_by_attribute:
+            return None
+
+    assert keys_by_attribute is not None
+    return min(keys_by_attribute.items(), key=lambda item: len(item[1]))
+
+
+def _numeric_intervals(rules: Sequence[Rule]) -> Optional[Tuple[str, List[Interval]]]:
+    """
+    Returns an attribute that every rule bounds with numeric comparisons,
+    together with the interval each rule allows for it.
+    """
+    if not rules:
+        return None
+
+    intervals_by_attribute: Optional[Dict[str, List[Interval]]] = None
+    for rule in rules:
+        rule_intervals: Dict[str, Interval] = {}
+        for condition in rule.conditions:
+            if condition.operator not in NUMERIC_BOUNDS or not _is_bound(
+                condition.value
+            ):
+                continue
+            interval = rule_intervals.get(
+                condition.attribute, Interval(-math.inf, False, math.inf, False)
+            )
+            # all conditions of a rule must hold, so the interval narrows
+            rule_intervals[condition.attribute] = NUMERIC_BOUNDS[condition.operator](
+                interval, condition.value
+            )
+
+        if intervals_by_attribute is None:
+            intervals_by_attribute = {
+                attribute: [interval] for attribute, interval in rule_intervals.items()
+            }
+        else:
+            intervals_by_attribute = {
+                attribute: intervals + [rule_intervals[attribute]]
+                for attribute, intervals in intervals_by_attribute.items()
+                if attribute in rule_intervals
+            }
+        if not intervals_by_attribute:
+            return None
+
+    assert intervals_by_attribute is not None
+    return next(iter(intervals_by_attribute.items()))
+
+
+def _is_bound(value: Any) -> bool:
+    return isinstance(value, numbers.Real) and not math.isnan(value)
+
+
+def _raise_lower(interval: Interval, value: Any, inclusive: bool) -> Interval:
+    if value > interval.lower or (
+        value == interval.lower and interval.lower_inclusive and not inclusive
+    ):
+        return interval._replace(lower=value, lower_inclusive=inclusive)
+    return interval
+
+
+def _lower_upper(interval: Interval, value: Any, inclusive: bool) -> Interval:
+    if value < interval.upper or (
+        value == interval.upper and interval.upper_inclusive and not inclusive
+    ):
+        return interval._replace(upper=value, upper_inclusive=inclusive)
+    return interval
+
+
+NUMERIC_BOUNDS = {
+    OperatorType.GT: lambda interval, value: _raise_lower(interval, value, False),
+    OperatorType.GTE: lambda interval, value: _raise_lower(interval, value, True),
+    OperatorType.LT: lambda interval, value: _lower_upper(interval, value, False),
+    OperatorType.LTE: lambda interval, value: _lower_upper(interval, value, True),
+}
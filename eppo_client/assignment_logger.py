@@ -1,13 +1,40 @@
-from typing import Dict, Optional, Tuple, MutableMapping
+from typing import Dict, List, Optional, Tuple, MutableMapping
 
 
 class AssignmentLogger:
     def log_assignment(self, assignment_event: Dict):
         pass
 
+    def log_assignments(self, assignment_events: List[Dict]):
+        """Logs the assignment events of a batch assignment.
+
+        Calls :meth:`log_assignment` for each event by default; override it to
+        send the whole batch at once.
+        """
+        for assignment_event in assignment_events:
+            self.log_assignment(assignment_event)
+
     def log_bandit_action(self, bandit_event: Dict):
         pass
 
+    def _should_log_assignment(
+        self,
+        flag_key: str,
+        subject_key: str,
+        allocation_key: Optional[str],
+        variation_key: Optional[str],
+    ) -> bool:
+        """Whether logging this assignment may have an effect.
+
+        Lets the client skip building events that would be dropped.
+        """
+        # the base implementation drops every event; the methods are looked up
+        # on the instance, which may have its own (e.g. a mock)
+        return not (
+            _is_base_method(self.log_assignment, AssignmentLogger.log_assignment)
+            and _is_base_method(self.log_assignments, AssignmentLogger.log_assignments)
+        )
+
 
 class AssignmentCacheLogger(AssignmentLogger):
     def __init__(
@@ -28,6 +55,30 @@ class AssignmentCacheLogger(AssignmentLogger):
             lambda: self.__inner.log_assignment(event),
         )
 
+    def log_assignments(self, events: List[Dict]):
+        if self.__assignment_cache is None:
+            log_assignments_to(self.__inner, events)
+            return
+
+        # Events are only cached once the inner logger has accepted them, so
+        # that a failed batch is logged again on the next attempt.
+        uncached_events = []
+        batch_values: Dict[Tuple, Tuple] = {}
+        for event in events:
+            key, value = AssignmentCacheLogger.__assignment_cache_keyvalue(event)
+            previous = batch_values.get(key, self.__assignment_cache.get(key))
+            if previous and previous == value:
+                # ok, cached or earlier in the batch
+                continue
+            batch_values[key] = value
+            uncached_events.append(event)
+        if not uncached_events:
+            return
+
+        log_assignments_to(self.__inner, uncached_events)
+        for key, value in batch_values.items():
+            self.__assignment_cache[key] = value
+
     def log_bandit_action(self, event: Dict):
         _cache_or_call(
             self.__bandit_cache,
@@ -35,6 +86,22 @@ class AssignmentCacheLogger(AssignmentLogger):
             lambda: self.__inner.log_bandit_action(event),
         )
 
+    def _should_log_assignment(
+        self,
+        flag_key: str,
+        subject_key: str,
+        allocation_key: Optional[str],
+        variation_key: Optional[str],
+    ) -> bool:
+        if self.__assignment_cache is not None and self.__assignment_cache.get(
+            (flag_key, subject_key)
+        ) == (allocation_key, variation_key):
+            # a duplicate
+            return False
+        return should_log_assignment(
+            self.__inner, flag_key, subject_key, allocation_key, variation_key
+        )
+
     @staticmethod
     def __assignment_cache_keyvalue(event: Dict) -> Tuple[Tuple, Tuple]:
         key = (event["featureFlag"], event["subject"])
@@ -48,6 +115,38 @@ class AssignmentCacheLogger(AssignmentLogger):
         return key, value
 
 
+def should_log_assignment(
+    logger: AssignmentLogger,
+    flag_key: str,
+    subject_key: str,
+    allocation_key: Optional[str],
+    variation_key: Optional[str],
+) -> bool:
+    """Whether the logger may log this assignment. Loggers that do not
+    subclass AssignmentLogger may not implement the check, and log everything.
+    """
+    check = getattr(logger, "_should_log_assignment", None)
+    if check is None:
+        return True
+    return check(flag_key, subject_key, allocation_key, variation_key)
+
+
+def log_assignments_to(logger: AssignmentLogger, events: List[Dict]) -> None:
+    """Logs a batch of events, one by one if the logger only implements
+    log_assignment.
+    """
+    log_assignments = getattr(logger, "log_assignments", None)
+    if log_assignments is None:
+        for event in events:
+            logger.log_assignment(event)
+    else:
+        log_assignments(events)
+
+
+def _is_base_method(method, base_function) -> bool:
+    return getattr(method, "__func__", None) is base_function
+
+
 def _cache_or_call(cache: Optional[MutableMapping], key, value, fn):
     if cache is not None and (previous := cache.get(key)) and previous == value:
         # ok, cached
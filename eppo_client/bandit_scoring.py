@@ -0,0 +1,518 @@
+"""
+Scoring of all the actions of a bandit at once, with the coefficients of the
+model compiled into dense arrays when the configuration is stored. Requires
+NumPy: ``pip install eppo-server-sdk[bulk]``. Without it, actions are scored
+one by one.
+
+Every score is accumulated in the same order as ``score_action``, and the
+weights are added exactly like ``sum()`` adds them in ``weigh_actions``, so the
+results are identical to the action-by-action evaluation on every Python
+version. This costs throughput: see ``sum_rows``.
+"""
+
+import numbers
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from eppo_client.models import (
+    BanditCategoricalAttributeCoefficient,
+    BanditModelData,
+    BanditNumericAttributeCoefficient,
+)
+
+# Position of the action of subjects for whom no action is selected.
+NOT_SELECTED = -1
+
+# checked first, numbers.Real is a slow isinstance check
+_NUMERIC_TYPES = (float, int, bool, type(None))
+
+# From Python 3.12, sum() of floats is compensated (Neumaier's algorithm), and
+# rounds differently from adding them one after the other.
+_COMPENSATED_SUM = sum([1.0, 1e100, 1.0, -1e100]) == 2.0
+
+
+class CompiledNumericCoefficients(NamedTuple):
+    """
+    Numeric coefficients with one row per action, and one column per position
+    in its list of coefficients. Shorter lists are padded with coefficients of
+    0 for an attribute that is always missing, at index len(attribute_keys).
+    """
+
+    attribute_keys: Tuple[str, ...]
+    attribute_indices: np.ndarray
+    coefficients: np.ndarray
+    missing_value_coefficients: np.ndarray
+
+    def attribute_values(
+        self, attributes: Sequence[Mapping[str, float]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the values of the attributes, one row per mapping, and whether
+        they are present.
+        """
+        values = [
+            row_attributes.get(key)
+            for row_attributes in attributes
+            for key in self.attribute_keys
+        ]
+        for value in values:
+            if type(value) not in _NUMERIC_TYPES and not isinstance(
+                value, numbers.Real
+            ):
+                raise TypeError(f"Numeric attribute has a non-numeric value: {value!r}")
+
+        # the always missing attribute is in the last column
+        shape = (len(attributes), len(self.attribute_keys) + 1)
+        present = np.zeros(shape, dtype=bool)
+        present[:, :-1] = np.array([value is not None for value in values]).reshape(
+            len(attributes), len(self.attribute_keys)
+        )
+        numeric_values = np.zeros(shape)
+        numeric_values[:, :-1] = np.array(
+            [0.0 if value is None else value for value in values], dtype=np.float64
+        ).reshape(len(attributes), len(self.attribute_keys))
+        return numeric_values, present
+
+    def score(
+        self,
+        rows: np.ndarray,
+        value_rows: np.ndarray,
+        values: np.ndarray,
+        present: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Vectorized score_numeric_attributes for the given actions, with the
+        values in value_rows. The result has their broadcast shape.
+        """
+        score = np.zeros(np.broadcast(value_rows, rows).shape)
+        for column in range(self.attribute_indices.shape[1]):
+            attribute_indices = self.attribute_indices[rows, column]
+            score += np.where(
+                present[value_rows, attribute_indices],
+                self.coefficients[rows, column] * values[value_rows, attribute_indices],
+                self.missing_value_coefficients[rows, column],
+            )
+        return score
+
+
+class CompiledCategoricalCoefficients(NamedTuple):
+    """
+    Categorical coefficients laid out like CompiledNumericCoefficients.
+
+    Every attribute value that has a coefficient gets an id. The coefficients
+    of each column are looked up by ``row * id_stride + value id`` in a sorted
+    array; ``id_stride - 1`` is the id of missing and unknown values.
+    """
+
+    attribute_keys: Tuple[str, ...]
+    value_ids: Tuple[Dict[str, int], ...]
+    id_stride: int
+    attribute_indices: np.ndarray
+    missing_value_coefficients: np.ndarray
+    value_keys: Tuple[np.ndarray, ...]
+    value_coefficients: Tuple[np.ndarray, ...]
+
+    def attribute_values(self, attributes: Sequence[Mapping[str, str]]) -> np.ndarray:
+        """Returns the ids of the attribute values, one row per mapping."""
+        missing = self.id_stride - 1
+        # the always missing attribute is in the last column
+        ids = np.full((len(attributes), len(self.attribute_keys) + 1), missing)
+        ids[:, :-1] = np.array(
+            [
+                (
+                    value_ids.get(row_attributes[key], missing)
+                    if key in row_attributes
+                    else missing
+                )
+                for row_attributes in attributes
+                for key, value_ids in zip(self.attribute_keys, self.value_ids)
+            ],
+            dtype=np.int64,
+        ).reshape(len(attributes), len(self.attribute_keys))
+        return ids
+
+    def score(
+        self, rows: np.ndarray, value_rows: np.ndarray, ids: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized score_categorical_attributes for the given actions, with the
+        value ids in value_rows. The result has their broadcast shape.
+        """
+        score = np.zeros(np.broadcast(value_rows, rows).shape)
+        for column in range(self.attribute_indices.shape[1]):
+            missing_value_coefficients = self.missing_value_coefficients[rows, column]
+            value_keys = self.value_keys[column]
+            if not len(value_keys):
+                score += missing_value_coefficients
+                continue
+            keys = (
+                rows * self.id_stride
+                + ids[value_rows, self.attribute_indices[rows, column]]
+            )
+            positions = np.minimum(
+                np.searchsorted(value_keys, keys), len(value_keys) - 1
+            )
+            score += np.where(
+                value_keys[positions] == keys,
+                self.value_coefficients[column][positions],
+                missing_value_coefficients,
+            )
+        return score
+
+
+class CompiledBanditModel(NamedTuple):
+    """
+    Scoring plan for a bandit model, built once when the configuration is
+    stored. The source model is kept for its other parameters.
+    """
+
+    model: BanditModelData
+    action_rows: Dict[str, int]
+    intercepts: np.ndarray
+    subject_numeric: CompiledNumericCoefficients
+    subject_categorical: CompiledCategoricalCoefficients
+    action_numeric: CompiledNumericCoefficients
+    action_categorical: CompiledCategoricalCoefficients
+
+    def score_action_terms(
+        self,
+        action_numeric_attributes: Sequence[Mapping[str, float]],
+        action_categorical_attributes: Sequence[Mapping[str, str]],
+        action_keys: Sequence[str],
+    ) -> "ActionTerms":
+        """Returns the terms of the scores that do not depend on the subject."""
+        positions = [
+            position
+            for position, action_key in enumerate(action_keys)
+            if action_key in self.action_rows
+        ]
+        rows = np.array(
+            [self.action_rows[action_keys[i]] for i in positions], dtype=np.int64
+        )
+        action_rows = np.arange(len(positions))
+        values, present = self.action_numeric.attribute_values(
+            [action_numeric_attributes[i] for i in positions]
+        )
+        ids = self.action_categorical.attribute_values(
+            [action_categorical_attributes[i] for i in positions]
+        )
+        return ActionTerms(
+            number_of_actions=len(action_keys),
+            positions=positions,
+            rows=rows,
+            numeric=self.action_numeric.score(rows, action_rows, values, present),
+            categorical=self.action_categorical.score(rows, action_rows, ids),
+        )
+
+    def score_subject_terms(
+        self,
+        subject_numeric_attributes: Sequence[Mapping[str, float]],
+        subject_categorical_attributes: Sequence[Mapping[str, str]],
+    ) -> "SubjectTerms":
+        """
+        Returns the intercept and subject terms of the scores of each subject
+        (rows) for every action of the model (columns).
+        """
+        # float arithmetic yields inf and NaN without warnings in Python
+        with np.errstate(over="ignore", invalid="ignore"):
+            return SubjectTerms(
+                self.__score_subject_terms(
+                    np.arange(len(self.intercepts)),
+                    subject_numeric_attributes,
+                    subject_categorical_attributes,
+                )
+            )
+
+    def score_subjects(
+        self,
+        subject_numeric_attributes: Sequence[Mapping[str, float]],
+        subject_categorical_attributes: Sequence[Mapping[str, str]],
+        action_terms: "ActionTerms",
+        subject_terms: Optional["SubjectTerms"] = None,
+    ) -> np.ndarray:
+        """
+        Returns the score of each subject (rows) for each action (columns, in
+        the order of the action terms), with the subject terms computed
+        beforehand if given.
+        """
+        number_of_subjects = len(subject_numeric_attributes)
+        scores = np.full(
+            (number_of_subjects, action_terms.number_of_actions),
+            self.model.default_action_score,
+        )
+        if not action_terms.positions:
+            return scores
+
+        if subject_terms is not None:
+            score = subject_terms.scores[:, action_terms.rows]
+        else:
+            score = self.__score_subject_terms(
+                action_terms.rows,
+                subject_numeric_attributes,
+                subject_categorical_attributes,
+            )
+        # the action terms are the same for every subject, and added one after
+        # the other like in score_action
+        score += action_terms.numeric
+        score += action_terms.categorical
+
+        scores[:, action_terms.positions] = score
+        return scores
+
+    def __score_subject_terms(
+        self,
+        rows: np.ndarray,
+        subject_numeric_attributes: Sequence[Mapping[str, float]],
+        subject_categorical_attributes: Sequence[Mapping[str, str]],
+    ) -> np.ndarray:
+        subject_rows = np.arange(len(subject_numeric_attributes))[:, np.newaxis]
+        values, present = self.subject_numeric.attribute_values(
+            subject_numeric_attributes
+        )
+        score = self.intercepts[rows] + self.subject_numeric.score(
+            rows, subject_rows, values, present
+        )
+        ids = self.subject_categorical.attribute_values(subject_categorical_attributes)
+        score += self.subject_categorical.score(rows, subject_rows, ids)
+        return score
+
+
+class ActionTerms(NamedTuple):
+    """
+    The action numeric and action categorical terms of the scores of a set of
+    actions under a compiled model, for the actions that have coefficients.
+    """
+
+    number_of_actions: int
+    # positions of the actions with coefficients, and their rows in the model
+    positions: List[int]
+    rows: np.ndarray
+    numeric: np.ndarray
+    categorical: np.ndarray
+
+
+class SubjectTerms(NamedTuple):
+    """
+    The intercept and subject terms of the scores of subjects (rows) under a
+    compiled model, for every action of the model (columns).
+    """
+
+    scores: np.ndarray
+
+
+def compile_bandit_model(model: BanditModelData) -> CompiledBanditModel:
+    coefficients = list(model.coefficients.values())
+    return CompiledBanditModel(
+        model=model,
+        action_rows={
+            action_key: row for row, action_key in enumerate(model.coefficients)
+        },
+        intercepts=np.array(
+            [action.intercept for action in coefficients], dtype=np.float64
+        ),
+        subject_numeric=compile_numeric_coefficients(
+            [action.subject_numeric_coefficients for action in coefficients]
+        ),
+        subject_categorical=compile_categorical_coefficients(
+            [action.subject_categorical_coefficients for action in coefficients]
+        ),
+        action_numeric=compile_numeric_coefficients(
+            [action.action_numeric_coefficients for action in coefficients]
+        ),
+        action_categorical=compile_categorical_coefficients(
+            [action.action_categorical_coefficients for action in coefficients]
+        ),
+    )
+
+
+def compile_numeric_coefficients(
+    coefficients: List[List[BanditNumericAttributeCoefficient]],
+) -> CompiledNumericCoefficients:
+    attribute_keys = _attribute_keys(coefficients)
+    attribute_index = {key: i for i, key in enumerate(attribute_keys)}
+    shape = (len(coefficients), max(map(len, coefficients), default=0))
+    # padding refers to the always missing attribute, with coefficients of 0
+    attribute_indices = np.full(shape, len(attribute_keys), dtype=np.int64)
+    values = np.zeros(shape)
+    missing_value_coefficients = np.zeros(shape)
+    for row, action_coefficients in enumerate(coefficients):
+        for column, coefficient in enumerate(action_coefficients):
+            attribute_indices[row, column] = attribute_index[coefficient.attribute_key]
+            values[row, column] = coefficient.coefficient
+            missing_value_coefficients[row, column] = (
+                coefficient.missing_value_coefficient
+            )
+    return CompiledNumericCoefficients(
+        attribute_keys=attribute_keys,
+        attribute_indices=attribute_indices,
+        coefficients=values,
+        missing_value_coefficients=missing_value_coefficients,
+    )
+
+
+def compile_categorical_coefficients(
+    coefficients: List[List[BanditCategoricalAttributeCoefficient]],
+) -> CompiledCategoricalCoefficients:
+    attribute_keys = _attribute_keys(coefficients)
+    attribute_index = {key: i for i, key in enumerate(attribute_keys)}
+    value_ids: List[Dict[str, int]] = [{} for _ in attribute_keys]
+    next_id = 0
+    for action_coefficients in coefficients:
+        for coefficient in action_coefficients:
+            ids = value_ids[attribute_index[coefficient.attribute_key]]
+            for value in coefficient.value_coefficients:
+                if value not in ids:
+                    ids[value] = next_id
+                    next_id += 1
+    # the last id is for missing and unknown values
+    id_stride = next_id + 1
+
+    shape = (len(coefficients), max(map(len, coefficients), default=0))
+    attribute_indices = np.full(shape, len(attribute_keys), dtype=np.int64)
+    missing_value_coefficients = np.zeros(shape)
+    column_values: List[Dict[int, float]] = [{} for _ in range(shape[1])]
+    for row, action_coefficients in enumerate(coefficients):
+        for column, coefficient in enumerate(action_coefficients):
+            attribute = attribute_index[coefficient.attribute_key]
+            attribute_indices[row, column] = attribute
+            missing_value_coefficients[row, column] = (
+                coefficient.missing_value_coefficient
+            )
+            for value, value_coefficient in coefficient.value_coefficients.items():
+                key = row * id_stride + value_ids[attribute][value]
+                column_values[column][key] = value_coefficient
+
+    value_keys = []
+    value_coefficients = []
+    for values in column_values:
+        keys = sorted(values)
+        value_keys.append(np.array(keys, dtype=np.int64))
+        value_coefficients.append(
+            np.array([values[key] for key in keys], dtype=np.float64)
+        )
+    return CompiledCategoricalCoefficients(
+        attribute_keys=attribute_keys,
+        value_ids=tuple(value_ids),
+        id_stride=id_stride,
+        attribute_indices=attribute_indices,
+        missing_value_coefficients=missing_value_coefficients,
+        value_keys=tuple(value_keys),
+        value_coefficients=tuple(value_coefficients),
+    )
+
+
+def best_scores(scores: np.ndarray) -> np.ndarray:
+    """Returns max() of each row of scores."""
+    best = scores.max(axis=1)
+    # unlike max(), np.max propagates NaN wherever it is in the row
+    for row in np.flatnonzero(np.isnan(best)).tolist():
+        best[row] = max(scores[row].tolist())
+    return best
+
+
+def weigh_scores(
+    action_keys: Sequence[str],
+    scores: np.ndarray,
+    gamma: float,
+    probability_floor: float,
+) -> np.ndarray:
+    """
+    Vectorized BanditEvaluator.weigh_actions, for each row of scores, in the
+    order of action_keys. The weights are identical to weigh_actions rather
+    than approximately equal, which is why they are added with sum_rows and
+    not np.sum.
+    """
+    number_of_actions = len(action_keys)
+    best = best_scores(scores)
+    # the lowest lexicographically ordered key among the best scores
+    key_order = np.argsort(np.array(action_keys, dtype=object), kind="stable")
+    is_best = scores[:, key_order] == best[:, np.newaxis]
+    if not is_best.any(axis=1).all():
+        raise ValueError("No best action: the best score is NaN")
+    best_positions = key_order[is_best.argmax(axis=1)]
+
+    min_probability = probability_floor / number_of_actions
+    weights = 1.0 / (number_of_actions + gamma * (best[:, np.newaxis] - scores))
+    # same as max(min_probability, weight)
+    weights = np.where(weights > min_probability, weights, min_probability)
+
+    # Remaining weight goes to best action. The other weights are added like
+    # sum() in weigh_actions; a zero in place of the best weight leaves the
+    # sum unchanged, compensated or not.
+    other_weights = weights.copy()
+    other_weights[np.arange(len(scores)), best_positions] = 0.0
+    remaining_weights = 1.0 - sum_rows(other_weights)
+    weights[np.arange(len(scores)), best_positions] = np.where(
+        remaining_weights > 0.0, remaining_weights, 0.0
+    )
+    return weights
+
+
+def sum_rows(values: np.ndarray) -> np.ndarray:
+    """
+    Returns sum() of each row of values, to the last bit, which np.sum does
+    not: it adds values pairwise, and without compensation.
+
+    Matching sum() means adding the values of a row one after the other, so
+    only one dimension is vectorized: with fewer rows than columns, each row
+    is added with sum() itself; otherwise each column is added to all the
+    rows at once, which costs a few NumPy calls per column. Either way this is
+    slower than np.sum, the price of weights identical to weigh_actions.
+    """
+    if len(values) <= values.shape[1]:
+        return np.array([sum(row) for row in values.tolist()], dtype=np.float64)
+
+    total = np.zeros(len(values))
+    if not _COMPENSATED_SUM:
+        for column in values.T:
+            total += column
+        return total
+
+    # as in CPython's sum()
+    compensation = np.zeros(len(values))
+    for column in values.T:
+        new_total = total + column
+        compensation += np.where(
+            np.abs(total) >= np.abs(column),
+            (total - new_total) + column,
+            (column - new_total) + total,
+        )
+        total = new_total
+    # an infinite compensation would turn an overflowed sum into NaN
+    return np.where(np.isfinite(compensation), total + compensation, total)
+
+
+def select_actions(
+    action_keys: Sequence[str],
+    action_shards: np.ndarray,
+    weights: np.ndarray,
+    shard_values: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized BanditEvaluator.select_action: returns the position of the
+    selected action for each row of weights, or NOT_SELECTED if its weights
+    add up to no more than its shard value.
+    """
+    # deterministic ordering, with ties broken by action name
+    key_ranks = np.empty(len(action_keys), dtype=np.int64)
+    key_ranks[np.argsort(np.array(action_keys, dtype=object), kind="stable")] = (
+        np.arange(len(action_keys))
+    )
+    order = np.lexsort((np.broadcast_to(key_ranks, action_shards.shape), action_shards))
+
+    cumulative_weights = np.cumsum(np.take_along_axis(weights, order, axis=1), axis=1)
+    selected = cumulative_weights > shard_values[:, np.newaxis]
+    positions = np.take_along_axis(
+        order, selected.argmax(axis=1)[:, np.newaxis], axis=1
+    )[:, 0]
+    positions[~selected.any(axis=1)] = NOT_SELECTED
+    return positions
+
+
+def _attribute_keys(coefficients) -> Tuple[str, ...]:
+    keys: Dict[str, None] = {}
+    for action_coefficients in coefficients:
+        for coefficient in action_coefficients:
+            keys[coefficient.attribute_key] = None
+    return tuple(keys)
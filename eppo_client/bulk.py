@@ -0,0 +1,339 @@
+"""
+Assignment of whole columns of subjects to a flag or a bandit, for offline
+analysis, backfills and simulations. Requires NumPy:
+``pip install eppo-server-sdk[bulk]``.
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from eppo_client.bandit import (
+    ActionCatalog,
+    ActionContexts,
+    BanditEvaluationError,
+    ContextAttributes,
+)
+from eppo_client.bandit_scoring import (
+    NOT_SELECTED,
+    CompiledBanditModel,
+    SubjectTerms,
+    best_scores,
+    compile_bandit_model,
+    select_actions,
+    weigh_scores,
+)
+from eppo_client.eval import CompiledFlag, CompiledShard, compile_flag, hash_key
+from eppo_client.models import BanditModelData, Flag, Variation, VariationType
+from eppo_client.rules import SubjectAttributesView
+from eppo_client.sharders import MD5Sharder, Sharder
+from eppo_client.types import Attributes
+
+# Index of subjects without an assigned allocation or variation.
+NOT_ASSIGNED = -1
+
+
+@dataclass
+class BulkFlagEvaluation:
+    """
+    Assignments of many subjects to one flag, in the order of the subjects.
+
+    ``allocation_indices`` index ``allocation_keys`` and ``variation_indices``
+    index ``variations``; both are NOT_ASSIGNED for subjects that match no
+    allocation.
+    """
+
+    flag_key: str
+    variation_type: VariationType
+    allocation_keys: Tuple[str, ...]
+    variations: Tuple[Variation, ...]
+    allocation_indices: np.ndarray
+    variation_indices: np.ndarray
+
+    def values(self, default: Any = None) -> List[Any]:
+        """Returns the assigned variation value of each subject."""
+        values = [variation.value for variation in self.variations] + [default]
+        # NOT_ASSIGNED picks the trailing default
+        return [values[index] for index in self.variation_indices.tolist()]
+
+
+@dataclass
+class BulkEvaluator:
+    """
+    Evaluates a flag for many subjects at once, with the same results as
+    ``Evaluator.evaluate_flag`` on each subject.
+
+    Subjects are hashed once per shard salt, and shard membership is looked up
+    for all of them at once in the bitmaps of the compiled shards.
+    """
+
+    sharder: Sharder = field(default_factory=MD5Sharder)
+
+    def evaluate_flag(
+        self,
+        flag: Union[CompiledFlag, Flag],
+        subject_keys: Sequence[str],
+        subject_attributes: Optional[Sequence[Attributes]] = None,
+    ) -> BulkFlagEvaluation:
+        if isinstance(flag, Flag):
+            flag = compile_flag(flag)
+
+        subject_keys = list(subject_keys)
+        if subject_attributes is not None and len(subject_attributes) != len(
+            subject_keys
+        ):
+            raise ValueError(
+                "subject_attributes must have one entry per subject key, "
+                f"got {len(subject_attributes)} for {len(subject_keys)} subjects"
+            )
+
+        variations = flag.variations
+        allocation_indices = np.full(len(subject_keys), NOT_ASSIGNED, dtype=np.int64)
+        variation_indices = np.full(len(subject_keys), NOT_ASSIGNED, dtype=np.int64)
+        result = BulkFlagEvaluation(
+            flag_key=flag.key,
+            variation_type=flag.variation_type,
+            allocation_keys=tuple(allocation.key for allocation in flag.allocations),
+            variations=variations,
+            allocation_indices=allocation_indices,
+            variation_indices=variation_indices,
+        )
+        if not flag.enabled or not subject_keys:
+            return result
+
+        views: Optional[List[SubjectAttributesView]] = None
+        shard_values: Dict[str, np.ndarray] = {}
+        unassigned = np.ones(len(subject_keys), dtype=bool)
+        active = flag.schedule.active()
+        for position, allocation in enumerate(flag.allocations):
+            if not active[position]:
+                continue
+
+            eligible = unassigned.copy()
+            if allocation.rules:
+                if views is None:
+                    views = [
+                        SubjectAttributesView(
+                            subject_key,
+                            {} if subject_attributes is None else subject_attributes[i],
+                        )
+                        for i, subject_key in enumerate(subject_keys)
+                    ]
+                for i in np.flatnonzero(eligible).tolist():
+                    eligible[i] = any(
+                        rule.matches(views[i]) for rule in allocation.rules
+                    )
+
+            for split in allocation.splits:
+                if not eligible.any():
+                    break
+                matched = eligible.copy()
+                for shard in split.shards:
+                    if shard.salt not in shard_values:
+                        shard_values[shard.salt] = get_shards(
+                            subject_keys, shard.salt, flag.total_shards, self.sharder
+                        )
+                    matched &= shard_contains(shard, shard_values[shard.salt])
+
+                # subjects of an invalid variation stay unassigned
+                if split.valid:
+                    allocation_indices[matched] = position
+                if split.valid and split.variation is not None:
+                    variation_indices[matched] = variations.index(split.variation)
+                eligible &= ~matched
+                unassigned &= ~matched
+
+            if not unassigned.any():
+                break
+
+        return result
+
+
+@dataclass
+class BulkBanditEvaluation:
+    """
+    Actions selected by a bandit for many subjects, in the order of the
+    subjects.
+
+    ``action_indices`` index ``action_keys``, and are NOT_ASSIGNED when there
+    are no actions. The other arrays hold the score and weight of the selected
+    actions, and the optimality gap, as in ``BanditEvaluation``.
+    """
+
+    flag_key: str
+    action_keys: Tuple[str, ...]
+    action_indices: np.ndarray
+    action_scores: np.ndarray
+    action_weights: np.ndarray
+    optimality_gaps: np.ndarray
+    gamma: float
+
+    def actions(self) -> List[Optional[str]]:
+        """Returns the selected action of each subject."""
+        action_keys = list(self.action_keys) + [None]
+        # NOT_ASSIGNED picks the trailing None
+        return [action_keys[index] for index in self.action_indices.tolist()]
+
+
+@dataclass
+class BulkBanditEvaluator:
+    """
+    Evaluates a bandit for many subjects sharing a set of actions, with the
+    same results as ``BanditEvaluator.evaluate_bandit`` on each subject.
+
+    Scores, weights and selections are computed as (subjects x actions)
+    arrays, so memory grows with both; evaluate large populations in chunks.
+    """
+
+    sharder: Sharder = field(default_factory=MD5Sharder)
+    total_shards: int = 10_000
+
+    def evaluate_bandit(
+        self,
+        flag_key: str,
+        subject_keys: Sequence[str],
+        subject_attributes: Sequence[ContextAttributes],
+        actions: Union[ActionContexts, ActionCatalog],
+        bandit_model: Union[BanditModelData, CompiledBanditModel],
+        subject_terms: Optional[SubjectTerms] = None,
+    ) -> BulkBanditEvaluation:
+        """
+        subject_terms, from the model's score_subject_terms on the subject
+        attributes, can be passed when they were computed beforehand.
+        """
+        if isinstance(bandit_model, BanditModelData):
+            bandit_model = compile_bandit_model(bandit_model)
+        gamma = bandit_model.model.gamma
+
+        subject_keys = list(subject_keys)
+        if len(subject_attributes) != len(subject_keys):
+            raise ValueError(
+                "subject_attributes must have one entry per subject key, "
+                f"got {len(subject_attributes)} for {len(subject_keys)} subjects"
+            )
+        if subject_terms is not None and subject_terms.scores.shape != (
+            len(subject_keys),
+            len(bandit_model.intercepts),
+        ):
+            raise ValueError(
+                "subject_terms must have one row per subject key and one column "
+                f"per action of the model, got {subject_terms.scores.shape}"
+            )
+
+        catalog: Optional[ActionCatalog] = None
+        if isinstance(actions, ActionCatalog):
+            catalog = actions
+            action_contexts = actions.actions
+        else:
+            action_contexts = actions
+        action_keys = list(action_contexts)
+        if not action_keys or not subject_keys:
+            # no action is selected, as in null_evaluation
+            return BulkBanditEvaluation(
+                flag_key=flag_key,
+                action_keys=tuple(action_keys),
+                action_indices=np.full(len(subject_keys), NOT_ASSIGNED),
+                action_scores=np.zeros(len(subject_keys)),
+                action_weights=np.zeros(len(subject_keys)),
+                optimality_gaps=np.zeros(len(subject_keys)),
+                gamma=gamma,
+            )
+
+        # float arithmetic yields inf and NaN without warnings in Python
+        with np.errstate(over="ignore", invalid="ignore"):
+            if catalog is not None:
+                action_terms = catalog.action_terms(bandit_model)
+            else:
+                contexts = list(action_contexts.values())
+                action_terms = bandit_model.score_action_terms(
+                    [context.numeric_attributes for context in contexts],
+                    [context.categorical_attributes for context in contexts],
+                    action_keys,
+                )
+            scores = bandit_model.score_subjects(
+                [attributes.numeric_attributes for attributes in subject_attributes],
+                [
+                    attributes.categorical_attributes
+                    for attributes in subject_attributes
+                ],
+                action_terms,
+                subject_terms,
+            )
+            weights = weigh_scores(
+                action_keys, scores, gamma, bandit_model.model.action_probability_floor
+            )
+
+        # "{flag_key}-{subject_key}-{action_key}" orders the actions of each
+        # subject, and "{flag_key}-{subject_key}" picks one of them
+        action_shards = get_shards(
+            [
+                f"{subject_key}-{action_key}"
+                for subject_key in subject_keys
+                for action_key in action_keys
+            ],
+            flag_key,
+            self.total_shards,
+            self.sharder,
+        ).reshape(len(subject_keys), len(action_keys))
+        shard_values = (
+            get_shards(subject_keys, flag_key, self.total_shards, self.sharder)
+            / self.total_shards
+        )
+        action_indices = select_actions(
+            action_keys, action_shards, weights, shard_values
+        )
+        if (action_indices == NOT_SELECTED).any():
+            subject_key = subject_keys[int(np.argmax(action_indices == NOT_SELECTED))]
+            raise BanditEvaluationError(
+                f"[Eppo SDK] No action selected for {flag_key} {subject_key}"
+            )
+
+        subjects = np.arange(len(subject_keys))
+        action_scores = scores[subjects, action_indices]
+        with np.errstate(invalid="ignore"):
+            optimality_gaps = best_scores(scores) - action_scores
+        return BulkBanditEvaluation(
+            flag_key=flag_key,
+            action_keys=tuple(action_keys),
+            action_indices=action_indices,
+            action_scores=action_scores,
+            action_weights=weights[subjects, action_indices],
+            optimality_gaps=optimality_gaps,
+            gamma=gamma,
+        )
+
+
+def get_shards(
+    subject_keys: Sequence[str], salt: str, total_shards: int, sharder: Sharder
+) -> np.ndarray:
+    """Returns the shard value of each subject key for the given salt."""
+    if type(sharder) is MD5Sharder:
+        # Same as MD5Sharder.get_shard: the first 4 bytes of the digest, read
+        # big-endian, modulo total_shards. Skips the hex round trip per key.
+        md5 = hashlib.md5
+        prefixes = b"".join(
+            md5(hash_key(salt, subject_key).encode("utf-8")).digest()[:4]
+            for subject_key in subject_keys
+        )
+        return np.frombuffer(prefixes, dtype=">u4").astype(np.int64) % total_shards
+    return np.fromiter(
+        (
+            sharder.get_shard(hash_key(salt, subject_key), total_shards)
+            for subject_key in subject_keys
+        ),
+        dtype=np.int64,
+        count=len(subject_keys),
+    )
+
+
+def shard_contains(shard: CompiledShard, shard_values: np.ndarray) -> np.ndarray:
+    """Vectorized CompiledShard.contains."""
+    members = np.unpackbits(
+        np.frombuffer(shard.bitmap, dtype=np.uint8), bitorder="little"
+    ).astype(bool)
+    in_bitmap = (shard_values >= 0) & (shard_values < len(members))
+    if not in_bitmap.any():
+        return in_bitmap
+    return in_bitmap & members[np.where(in_bitmap, shard_values, 0)]
@@ -1,17 +1,39 @@
 import datetime
 import logging
-import json
-from typing import Any, Dict, Optional, Union
-from eppo_client.assignment_logger import AssignmentLogger
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+from eppo_client.assignment_logger import (
+    AssignmentLogger,
+    log_assignments_to,
+    should_log_assignment,
+)
 from eppo_client.bandit import (
     ActionAttributes,
+    ActionCatalog,
     BanditEvaluator,
     BanditResult,
+    CompiledBandit,
     ContextAttributes,
     ActionContexts,
+    convert_actions_to_action_contexts,
+    convert_attributes_to_context_attributes,
+    use_compiled_scoring,
 )
-from eppo_client.models import Flag
+from eppo_client.models import BanditModelData, Flag
 from eppo_client.configuration import Configuration
+from eppo_client.diagnostics import Diagnostics
 from eppo_client.configuration_requestor import (
     ExperimentConfigurationRequestor,
 )
@@ -20,13 +42,23 @@ from eppo_client.poller import Poller
 from eppo_client.sharders import MD5Sharder
 from eppo_client.types import Attributes, ValueType
 from eppo_client.validation import validate_not_blank
-from eppo_client.eval import FlagEvaluation, Evaluator, none_result
+from eppo_client.eval import (  # noqa: F401
+    CompiledFlag,
+    FlagEvaluation,
+    Evaluator,
+    check_value_type_match,
+    none_result,
+)
 from eppo_client.version import __version__
 from eppo_client.constants import (
+    DIAGNOSTICS_INTERVAL_SECONDS_DEFAULT,
     POLL_INTERVAL_SECONDS_DEFAULT,
     POLL_JITTER_SECONDS_DEFAULT,
 )
 
+if TYPE_CHECKING:
+    from eppo_client.bandit_scoring import SubjectTerms
+
 
 logger = logging.getLogger(__name__)
 
@@ -39,16 +71,28 @@ class EppoClient:
         is_graceful_mode: bool = True,
         poll_interval_seconds: Optional[int] = POLL_INTERVAL_SECONDS_DEFAULT,
         poll_jitter_seconds: int = POLL_JITTER_SECONDS_DEFAULT,
+        evaluation_cache: Optional[MutableMapping] = None,
+        json_assignment_views: bool = False,
+        diagnostics_interval_seconds: Optional[
+            float
+        ] = DIAGNOSTICS_INTERVAL_SECONDS_DEFAULT,
+        bandit_score_cache: Optional[MutableMapping] = None,
     ):
         self.__config_requestor = config_requestor
         self.__assignment_logger = assignment_logger
         self.__is_graceful_mode = is_graceful_mode
+        self.__evaluation_cache = evaluation_cache
+        self.__evaluation_cache_lock = threading.Lock()
+        self.__json_assignment_views = json_assignment_views
+        self.__diagnostics = Diagnostics(logger, diagnostics_interval_seconds)
+        self.__bandit_score_cache = bandit_score_cache
+        self.__bandit_score_cache_lock = threading.Lock()
 
         if poll_interval_seconds:
             self.__poller: Optional[Poller] = Poller(
                 interval_millis=poll_interval_seconds * 1000,
                 jitter_millis=poll_jitter_seconds * 1000,
-                callback=config_requestor.fetch_and_store_configurations,
+                callback=self.__poll,
             )
             self.__poller.start()
         else:
@@ -57,6 +101,11 @@ class EppoClient:
         self.__evaluator = Evaluator(sharder=MD5Sharder())
         self.__bandit_evaluator = BanditEvaluator(sharder=MD5Sharder())
 
+    def __poll(self):
+        self.__config_requestor.fetch_and_store_configurations()
+        # summarizes diagnostics that are no longer reported
+        self.__diagnostics.flush_if_due()
+
     def set_configuration(self, configuration: Configuration):
         self.__config_requestor._set_configuration(configuration)
 
@@ -130,17 +179,14 @@ class EppoClient:
         subject_attributes: Attributes,
         default: Dict[Any, Any],
     ) -> Dict[Any, Any]:
-        json_value = self.get_assignment_variation(
+        return self.__get_assignment_value(
             flag_key,
             subject_key,
             subject_attributes,
-            None,
+            default,
             VariationType.JSON,
+            self.__json_value,
         )
-        if json_value is None:
-            return default
-
-        return json.loads(json_value)
 
     def get_assignment_variation(
         self,
@@ -150,22 +196,141 @@ class EppoClient:
         default: Optional[ValueType],
         expected_variation_type: VariationType,
     ):
+        return self.__get_assignment_value(
+            flag_key,
+            subject_key,
+            subject_attributes,
+            default,
+            expected_variation_type,
+            _variation_value,
+        )
+
+    def __get_assignment_value(
+        self,
+        flag_key: str,
+        subject_key: str,
+        subject_attributes: Attributes,
+        default: Any,
+        expected_variation_type: VariationType,
+        value_of: Callable[[FlagEvaluation], Any],
+    ) -> Any:
         try:
             result = self.get_assignment_detail(
                 flag_key, subject_key, subject_attributes, expected_variation_type
             )
             if not result or not result.variation:
                 return default
-            return result.variation.value
+            return value_of(result)
         except ValueError as e:
             # allow ValueError to bubble up as it is a validation error
             raise e
         except Exception as e:
             if self.__is_graceful_mode:
-                logger.error("[Eppo SDK] Error getting assignment: " + str(e))
+                self.__diagnostics.report(
+                    logging.ERROR, "Error getting assignment", flag_key, str(e)
+                )
                 return default
             raise e
 
+    def get_string_assignments(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        default: str,
+    ) -> List[str]:
+        return self.get_assignment_variations(
+            flag_key, subjects, default, VariationType.STRING
+        )
+
+    def get_integer_assignments(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        default: int,
+    ) -> List[int]:
+        return self.get_assignment_variations(
+            flag_key, subjects, default, VariationType.INTEGER
+        )
+
+    def get_numeric_assignments(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        default: float,
+    ) -> List[float]:
+        # convert to float in case we get an int
+        return [
+            float(value)
+            for value in self.get_assignment_variations(
+                flag_key, subjects, default, VariationType.NUMERIC
+            )
+        ]
+
+    def get_boolean_assignments(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        default: bool,
+    ) -> List[bool]:
+        return self.get_assignment_variations(
+            flag_key, subjects, default, VariationType.BOOLEAN
+        )
+
+    def get_json_assignments(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        default: Dict[Any, Any],
+    ) -> List[Dict[Any, Any]]:
+        return self.__get_assignment_values(
+            flag_key, subjects, default, VariationType.JSON, self.__json_value
+        )
+
+    def get_assignment_variations(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        default: Optional[ValueType],
+        expected_variation_type: VariationType,
+    ) -> List[Any]:
+        """Batch version of :meth:`get_assignment_variation`
+
+        Evaluates one flag for many subjects at once, returning the assigned
+        values in the order of the subjects.
+
+        :param subjects: (subject key, subject attributes) pairs
+        """
+        return self.__get_assignment_values(
+            flag_key, subjects, default, expected_variation_type, _variation_value
+        )
+
+    def __get_assignment_values(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        default: Any,
+        expected_variation_type: VariationType,
+        value_of: Callable[[FlagEvaluation], Any],
+    ) -> List[Any]:
+        subjects = list(subjects)
+        try:
+            results = self.get_assignment_details(
+                flag_key, subjects, expected_variation_type
+            )
+            return [
+                value_of(result) if result.variation else default for result in results
+            ]
+        except ValueError as e:
+            # allow ValueError to bubble up as it is a validation error
+            raise e
+        except Exception as e:
+            if self.__is_graceful_mode:
+                self.__diagnostics.report(
+                    logging.ERROR, "Error getting assignments", flag_key, str(e)
+                )
+                return [default] * len(subjects)
+            raise e
+
     def get_assignment_detail(
         self,
         flag_key: str,
@@ -182,21 +347,212 @@ class EppoClient:
         The subject attributes are used for evaluating any targeting rules tied
         to the flag and logged in the logging callback.
         """
+        return self.__get_assignment_detail(
+            flag_key, subject_key, subject_attributes, expected_variation_type
+        )[1]
+
+    def __get_assignment_detail(
+        self,
+        flag_key: str,
+        subject_key: str,
+        subject_attributes: Attributes,
+        expected_variation_type: VariationType,
+    ) -> Tuple[Optional[CompiledFlag], FlagEvaluation]:
+        """Same as get_assignment_detail, also returning the flag it evaluated."""
         validate_not_blank("subject_key", subject_key)
         validate_not_blank("flag_key", flag_key)
         if subject_attributes is None:
             subject_attributes = {}
 
-        flag = self.__config_requestor.get_configuration(flag_key)
+        flag = self.__get_enabled_flag(flag_key, expected_variation_type)
+        if flag is None:
+            return flag, none_result(
+                flag_key, expected_variation_type, subject_key, subject_attributes
+            )
+
+        result = self.__evaluate_flag(flag, subject_key, subject_attributes)
+
+        try:
+            if self.__should_log_assignment(flag_key, result):
+                self.__assignment_logger.log_assignment(
+                    _assignment_event(flag_key, result)
+                )
+        except Exception as e:
+            self.__diagnostics.report(
+                logging.ERROR, "Error logging assignment event", flag_key, str(e)
+            )
+        return flag, result
 
+    def get_assignment_details(
+        self,
+        flag_key: str,
+        subjects: Iterable[Tuple[str, Attributes]],
+        expected_variation_type: VariationType,
+    ) -> List[FlagEvaluation]:
+        """Maps many subjects to a variation of the same flag
+
+        Same as calling :meth:`get_assignment_detail` for each subject, except that
+        the flag is resolved once and the assignment events are handed to the
+        assignment logger as a single batch.
+
+        :param flag_key: a feature flag identifier
+        :param subjects: (subject key, subject attributes) pairs
+        :return: the evaluations, in the order of the subjects
+        """
+        validate_not_blank("flag_key", flag_key)
+        subjects = [
+            (subject_key, subject_attributes or {})
+            for subject_key, subject_attributes in subjects
+        ]
+        for subject_key, _ in subjects:
+            validate_not_blank("subject_key", subject_key)
+
+        flag = self.__get_enabled_flag(flag_key, expected_variation_type)
         if flag is None:
-            logger.warning(
-                "[Eppo SDK] No assigned variation. Flag not found: " + flag_key
+            return [
+                none_result(
+                    flag_key, expected_variation_type, subject_key, subject_attributes
+                )
+                for subject_key, subject_attributes in subjects
+            ]
+
+        results = [
+            self.__evaluate_flag(flag, subject_key, subject_attributes)
+            for subject_key, subject_attributes in subjects
+        ]
+
+        self.__log_assignments(flag_key, results)
+        return results
+
+    def get_all_assignments(
+        self,
+        subject_key: str,
+        subject_attributes: Optional[Attributes] = None,
+        flag_keys: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """Assigns a subject to every flag at once
+
+        Cheaper than calling the typed assignment functions flag by flag, as
+        all the flags are read from the same configuration and the subject
+        attributes are prepared once. JSON variations are parsed.
+
+        :param subject_key: an identifier of the experiment subject
+        :param subject_attributes: optional attributes of the subject
+        :param flag_keys: only assign the subject to these flags
+        :return: the assigned values by flag key; flags without an assigned
+            variation are left out
+        """
+        try:
+            results = self.get_all_assignment_details(
+                subject_key, subject_attributes, flag_keys
             )
-            return none_result(
-                flag_key, expected_variation_type, subject_key, subject_attributes
+            return {
+                flag_key: (
+                    self.__json_value(result)
+                    if result.variation_type == VariationType.JSON
+                    else _variation_value(result)
+                )
+                for flag_key, result in results.items()
+                if result.variation
+            }
+        except ValueError as e:
+            # allow ValueError to bubble up as it is a validation error
+            raise e
+        except Exception as e:
+            if self.__is_graceful_mode:
+                self.__diagnostics.report(
+                    logging.ERROR, "Error getting assignments", "*", str(e)
+                )
+                return {}
+            raise e
+
+    def get_all_assignment_details(
+        self,
+        subject_key: str,
+        subject_attributes: Optional[Attributes] = None,
+        flag_keys: Optional[Iterable[str]] = None,
+    ) -> Dict[str, FlagEvaluation]:
+        """Maps a subject to a variation of every flag, or of the given flags
+
+        :return: the evaluations by flag key
+        """
+        validate_not_blank("subject_key", subject_key)
+        if subject_attributes is None:
+            subject_attributes = {}
+
+        # a single read, so that all the flags come from the same configuration
+        flags = self.__config_requestor.get_configurations()
+        if flag_keys is None:
+            selected_flags = list(flags.values())
+        else:
+            selected_flags = []
+            for flag_key in flag_keys:
+                flag = flags.get(flag_key)
+                if flag is None:
+                    self.__diagnostics.report(
+                        logging.WARNING,
+                        "No assigned variation. Flag not found",
+                        flag_key,
+                    )
+                else:
+                    selected_flags.append(flag)
+
+        results = self.__evaluator.evaluate_flags(
+            selected_flags, subject_key, subject_attributes
+        )
+
+        self.__log_assignments(None, results)
+        return {result.flag_key: result for result in results}
+
+    def __should_log_assignment(self, flag_key: str, result: FlagEvaluation) -> bool:
+        # checked before building the event, which costs more than this check
+        return result.do_log and should_log_assignment(
+            self.__assignment_logger,
+            flag_key,
+            result.subject_key,
+            result.allocation_key,
+            result.variation.key if result.variation else None,
+        )
+
+    def __log_assignments(
+        self, flag_key: Optional[str], results: List[FlagEvaluation]
+    ) -> None:
+        """Logs the assignments of a batch, under flag_key if given."""
+        try:
+            assignment_events = [
+                _assignment_event(flag_key or result.flag_key, result)
+                for result in results
+                if self.__should_log_assignment(flag_key or result.flag_key, result)
+            ]
+            if assignment_events:
+                log_assignments_to(self.__assignment_logger, assignment_events)
+        except Exception as e:
+            self.__diagnostics.report(
+                logging.ERROR,
+                "Error logging assignment events",
+                flag_key or "*",
+                str(e),
             )
 
+    def __json_value(self, result: FlagEvaluation) -> Any:
+        # parsed when the configuration was loaded
+        json_value = result.json_value
+        assert json_value is not None
+        if self.__json_assignment_views:
+            return json_value.view
+        return json_value.copy()
+
+    def __get_enabled_flag(
+        self, flag_key: str, expected_variation_type: VariationType
+    ) -> Optional[CompiledFlag]:
+        flag = self.__config_requestor.get_configuration(flag_key)
+
+        if flag is None:
+            self.__diagnostics.report(
+                logging.WARNING, "No assigned variation. Flag not found", flag_key
+            )
+            return None
+
         if not check_type_match(expected_variation_type, flag.variation_type):
             raise TypeError(
                 f"Variation value does not have the correct type."
@@ -204,42 +560,79 @@ class EppoClient:
             )
 
         if not flag.enabled:
-            logger.info(
-                "[Eppo SDK] No assigned variation. Flag is disabled: " + flag_key
-            )
-            return none_result(
-                flag_key, expected_variation_type, subject_key, subject_attributes
+            self.__diagnostics.report(
+                logging.INFO, "No assigned variation. Flag is disabled", flag_key
             )
+            return None
 
-        result = self.__evaluator.evaluate_flag(flag, subject_key, subject_attributes)
+        return flag
 
-        if result.variation and not check_value_type_match(
-            expected_variation_type, result.variation.value
-        ):
-            logger.error(
-                "[Eppo SDK] Variation value does not have the correct type for the flag: "
-                f"{flag_key} and variation key {result.variation.key}"
+    def __evaluate_flag(
+        self,
+        flag: CompiledFlag,
+        subject_key: str,
+        subject_attributes: Attributes,
+    ) -> FlagEvaluation:
+        evaluation_cache = self.__evaluation_cache
+        if evaluation_cache is None:
+            return self.__evaluator.evaluate_flag(flag, subject_key, subject_attributes)
+        return self.__evaluate_flag_cached(
+            evaluation_cache, flag, subject_key, subject_attributes
+        )
+
+    def __evaluate_flag_cached(
+        self,
+        evaluation_cache: MutableMapping,
+        flag: CompiledFlag,
+        subject_key: str,
+        subject_attributes: Attributes,
+    ) -> FlagEvaluation:
+        # Entries remember the compiled flag and the allocations that were
+        # active, so they go stale as soon as a new configuration is stored
+        # or an allocation starts or ends.
+        try:
+            cache_key = (
+                flag.key,
+                subject_key,
+                # with the types, so that e.g. 1, 1.0 and True stay apart
+                frozenset(
+                    (attribute, type(value), value)
+                    for attribute, value in subject_attributes.items()
+                ),
             )
-            return none_result(
-                flag_key, flag.variation_type, subject_key, subject_attributes
+            hash(cache_key)
+        except TypeError:
+            # attributes with unhashable values are not cached
+            return self.__evaluator.evaluate_flag(flag, subject_key, subject_attributes)
+
+        active = flag.schedule.active()
+        with self.__evaluation_cache_lock:
+            entry = evaluation_cache.get(cache_key)
+        if entry is not None and entry[0] is flag and entry[1] == active:
+            # only the outcome is cached; the subject is the caller's own
+            allocation_key, variation, extra_logging, do_log, json_value = entry[2]
+            return FlagEvaluation(
+                flag_key=flag.key,
+                variation_type=flag.variation_type,
+                subject_key=subject_key,
+                subject_attributes=subject_attributes,
+                allocation_key=allocation_key,
+                variation=variation,
+                extra_logging=extra_logging,
+                do_log=do_log,
+                json_value=json_value,
             )
 
-        assignment_event = {
-            **(result.extra_logging if result else {}),
-            "allocation": result.allocation_key if result else None,
-            "experiment": f"{flag_key}-{result.allocation_key}" if result else None,
-            "featureFlag": flag_key,
-            "variation": result.variation.key if result and result.variation else None,
-            "subject": subject_key,
-            "timestamp": _utcnow().isoformat(),
-            "subjectAttributes": subject_attributes,
-            "metaData": {"sdkLanguage": "python", "sdkVersion": __version__},
-        }
-        try:
-            if result and result.do_log:
-                self.__assignment_logger.log_assignment(assignment_event)
-        except Exception as e:
-            logger.error("[Eppo SDK] Error logging assignment event: " + str(e))
+        result = self.__evaluator.evaluate_flag(flag, subject_key, subject_attributes)
+        outcome = (
+            result.allocation_key,
+            result.variation,
+            result.extra_logging,
+            result.do_log,
+            result.json_value,
+        )
+        with self.__evaluation_cache_lock:
+            evaluation_cache[cache_key] = (flag, active, outcome)
         return result
 
     def get_bandit_action(
@@ -247,7 +640,7 @@ class EppoClient:
         flag_key: str,
         subject_key: str,
         subject_context: Union[ContextAttributes, Attributes],
-        actions: Union[ActionContexts, ActionAttributes],
+        actions: Union[ActionContexts, ActionAttributes, ActionCatalog],
         default: str,
     ) -> BanditResult:
         """
@@ -270,6 +663,8 @@ class EppoClient:
             actions (Union[ActionContexts, ActionAttributes]): The dictionary that maps action keys
                 to their context of actions with their contexts.
                 If supplying an ActionAttributes, it gets converted to an ActionContexts instance.
+                An ActionCatalog of actions passed on every call is converted and
+                partially scored only once.
             default (str): The default variation to use if an error is encountered retrieving the
                 assigned variation.
 
@@ -310,37 +705,67 @@ class EppoClient:
             )
 
             # first, get experiment assignment
-            variation = self.get_string_assignment(
-                flag_key,
-                subject_key,
-                subject_attributes,
-                default,
+            variation, bandit_key = self.__get_bandit_assignment(
+                flag_key, subject_key, subject_attributes, default
             )
-
-            if variation in self.get_bandit_keys():
+            if bandit_key is not None:
                 # next, if assigned a bandit, get the selected action
                 action = self.evaluate_bandit_action(
                     flag_key,
-                    variation,  # for now, we assume the variation value is always equal to the bandit key
+                    bandit_key,
                     subject_key,
                     subject_context,
                     actions,
                 )
         except Exception as e:
             if self.__is_graceful_mode:
-                logger.error("[Eppo SDK] Error getting bandit action: " + str(e))
+                self.__diagnostics.report(
+                    logging.ERROR, "Error getting bandit action", flag_key, str(e)
+                )
             else:
                 raise e
 
         return BanditResult(variation, action)
 
+    def __get_bandit_assignment(
+        self,
+        flag_key: str,
+        subject_key: str,
+        subject_attributes: Attributes,
+        default: str,
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Same as get_string_assignment, also returning the key of the bandit
+        behind the assigned variation, if any. The key is read from the flag
+        that was evaluated, so that both come from the same configuration.
+        """
+        try:
+            flag, result = self.__get_assignment_detail(
+                flag_key, subject_key, subject_attributes, VariationType.STRING
+            )
+            if flag is None or not result.variation:
+                return default, None
+            # the values of a string flag are checked when it is stored
+            variation = cast(str, result.variation.value)
+            return variation, flag.bandit_keys.get(variation)
+        except ValueError as e:
+            # allow ValueError to bubble up as it is a validation error
+            raise e
+        except Exception as e:
+            if self.__is_graceful_mode:
+                self.__diagnostics.report(
+                    logging.ERROR, "Error getting assignment", flag_key, str(e)
+                )
+                return default, None
+            raise e
+
     def evaluate_bandit_action(
         self,
         flag_key: str,
         bandit_key: str,
         subject_key: str,
         subject_context: Union[ContextAttributes, Attributes],
-        actions: Union[ActionContexts, ActionAttributes],
+        actions: Union[ActionContexts, ActionAttributes, ActionCatalog],
     ) -> Union[str, None]:
         # if no actions are given--a valid use case--return the variation with no action
         if len(actions) == 0:
@@ -349,22 +774,31 @@ class EppoClient:
         bandit_data = self.__config_requestor.get_bandit_model(bandit_key)
 
         if not bandit_data:
-            logger.warning(
-                f"[Eppo SDK] No assigned action. Bandit not found for flag: {flag_key}"
+            self.__diagnostics.report(
+                logging.WARNING,
+                "No assigned action. Bandit not found for flag",
+                flag_key,
             )
             return None
 
         subject_context_attributes = convert_attributes_to_context_attributes(
             subject_context
         )
-        action_contexts = convert_actions_to_action_contexts(actions)
+        action_contexts = (
+            actions
+            if isinstance(actions, ActionCatalog)
+            else convert_actions_to_action_contexts(actions)
+        )
 
         evaluation = self.__bandit_evaluator.evaluate_bandit(
             flag_key,
             subject_key,
             subject_context_attributes,
             action_contexts,
-            bandit_data.bandit_model_data,
+            bandit_data.model,
+            self.__get_subject_terms(
+                bandit_data, subject_context_attributes, action_contexts
+            ),
         )
 
         # log bandit action
@@ -402,10 +836,60 @@ class EppoClient:
             }
             self.__assignment_logger.log_bandit_action(bandit_event)
         except Exception as e:
-            logger.warn("[Eppo SDK] Error logging bandit event: " + str(e))
+            self.__diagnostics.report(
+                logging.WARNING, "Error logging bandit event", flag_key, str(e)
+            )
 
         return evaluation.action_key
 
+    def __get_subject_terms(
+        self,
+        bandit_data: CompiledBandit,
+        subject_attributes: ContextAttributes,
+        actions: Union[ActionContexts, ActionCatalog],
+    ) -> Optional["SubjectTerms"]:
+        bandit_score_cache = self.__bandit_score_cache
+        compiled_model = bandit_data.model
+        if (
+            bandit_score_cache is None
+            or isinstance(compiled_model, BanditModelData)
+            # the actions are then scored one by one
+            or not use_compiled_scoring(actions)
+        ):
+            return None
+
+        # Entries remember the compiled model, so they go stale as soon as a
+        # new configuration is stored. The subject key does not change the
+        # scores, subjects with the same attributes share an entry.
+        try:
+            cache_key = (
+                bandit_data.bandit_key,
+                bandit_data.bandit_model_version,
+                # with the types, so that e.g. 1, 1.0 and True stay apart
+                frozenset(
+                    (attribute, type(value), value)
+                    for attribute, value in subject_attributes.numeric_attributes.items()
+                ),
+                frozenset(subject_attributes.categorical_attributes.items()),
+            )
+            hash(cache_key)
+        except TypeError:
+            # attributes with unhashable values are not cached
+            return None
+
+        with self.__bandit_score_cache_lock:
+            entry = bandit_score_cache.get(cache_key)
+        if entry is not None and entry[0] is compiled_model:
+            return entry[1]
+
+        subject_terms = compiled_model.score_subject_terms(
+            [subject_attributes.numeric_attributes],
+            [subject_attributes.categorical_attributes],
+        )
+        with self.__bandit_score_cache_lock:
+            bandit_score_cache[cache_key] = (compiled_model, subject_terms)
+        return subject_terms
+
     def get_flag_keys(self):
         """
         Returns a list of all flag keys that have been initialized.
@@ -445,6 +929,37 @@ class EppoClient:
         """
         if self.__poller:
             self.__poller.stop()
+        self.__diagnostics.flush()
+
+    def get_diagnostic_counts(self) -> Dict[Tuple[str, str], int]:
+        """Returns how often each diagnostic was reported, such as a missing
+        or disabled flag, by (message, flag key).
+
+        Only the first occurrences of a diagnostic in every
+        ``diagnostics_interval_seconds`` are logged, followed by a summary line
+        counting the others.
+        """
+        self.__diagnostics.flush_if_due()
+        return self.__diagnostics.counts()
+
+
+def _assignment_event(flag_key: str, result: FlagEvaluation) -> Dict:
+    return {
+        **result.extra_logging,
+        "allocation": result.allocation_key,
+        "experiment": f"{flag_key}-{result.allocation_key}",
+        "featureFlag": flag_key,
+        "variation": result.variation.key if result.variation else None,
+        "subject": result.subject_key,
+        "timestamp": _utcnow().isoformat(),
+        "subjectAttributes": result.subject_attributes,
+        "metaData": {"sdkLanguage": "python", "sdkVersion": __version__},
+    }
+
+
+def _variation_value(result: FlagEvaluation) -> Any:
+    assert result.variation is not None
+    return result.variation.value
 
 
 def check_type_match(
@@ -453,23 +968,6 @@ def check_type_match(
     return expected_type is None or actual_type == expected_type
 
 
-def check_value_type_match(
-    expected_type: Optional[VariationType], value: ValueType
-) -> bool:
-    if expected_type is None:
-        return True
-    if expected_type in [VariationType.JSON, VariationType.STRING]:
-        return isinstance(value, str)
-    if expected_type == VariationType.INTEGER:
-        return isinstance(value, int)
-    if expected_type == VariationType.NUMERIC:
-        # we can convert int to float
-        return isinstance(value, float) or isinstance(value, int)
-    if expected_type == VariationType.BOOLEAN:
-        return isinstance(value, bool)
-    return False
-
-
 def convert_context_attributes_to_attributes(
     subject_context: Union[ContextAttributes, Attributes]
 ) -> Attributes:
@@ -480,27 +978,5 @@ def convert_context_attributes_to_attributes(
     return {**subject_context.numeric_attributes, **subject_context.categorical_attributes}  # type: ignore
 
 
-def convert_attributes_to_context_attributes(
-    subject_context: Union[ContextAttributes, Attributes]
-) -> ContextAttributes:
-    if isinstance(subject_context, dict):
-        return ContextAttributes.from_dict(subject_context)
-
-    stringified_categorical_attributes = {
-        key: str(value) for key, value in subject_context.categorical_attributes.items()
-    }
-
-    return ContextAttributes(
-        numeric_attributes=subject_context.numeric_attributes,
-        categorical_attributes=stringified_categorical_attributes,
-    )
-
-
-def convert_actions_to_action_contexts(
-    actions: Union[ActionContexts, ActionAttributes]
-) -> ActionContexts:
-    return {k: convert_attributes_to_context_attributes(v) for k, v in actions.items()}
-
-
 def _utcnow() -> datetime.datetime:
     return datetime.datetime.now(datetime.timezone.utc)
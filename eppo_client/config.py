@@ -1,11 +1,12 @@
-from pydantic import Field, ConfigDict
-from typing import Optional
+from pydantic import Field, ConfigDict, InstanceOf
+from typing import MutableMapping, Optional
 
 from eppo_client.assignment_logger import AssignmentLogger
 from eppo_client.base_model import SdkBaseModel
 from eppo_client.configuration import Configuration
 from eppo_client.validation import validate_not_blank
 from eppo_client.constants import (
+    DIAGNOSTICS_INTERVAL_SECONDS_DEFAULT,
     POLL_INTERVAL_SECONDS_DEFAULT,
     POLL_JITTER_SECONDS_DEFAULT,
 )
@@ -24,6 +25,14 @@ class Config(SdkBaseModel):
     poll_interval_seconds: Optional[int] = POLL_INTERVAL_SECONDS_DEFAULT
     poll_jitter_seconds: int = POLL_JITTER_SECONDS_DEFAULT
     initial_configuration: Optional[Configuration] = None
+    evaluation_cache: Optional[InstanceOf[MutableMapping]] = Field(
+        default=None, exclude=True
+    )
+    json_assignment_views: bool = False
+    diagnostics_interval_seconds: Optional[float] = DIAGNOSTICS_INTERVAL_SECONDS_DEFAULT
+    bandit_score_cache: Optional[InstanceOf[MutableMapping]] = Field(
+        default=None, exclude=True
+    )
 
     def _validate(self):
         validate_not_blank("api_key", self.api_key)
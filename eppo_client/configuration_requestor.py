@@ -1,9 +1,11 @@
 import logging
-from typing import Dict, Optional, cast
+from typing import Dict, List, Optional, cast
+from eppo_client.bandit import CompiledBandit, compile_bandit
 from eppo_client.configuration import Configuration
 from eppo_client.configuration_store import ConfigurationStore
+from eppo_client.eval import CompiledFlag, compile_flag
 from eppo_client.http_client import HttpClient
-from eppo_client.models import BanditData, Flag
+from eppo_client.models import BanditData, BanditVariation, Flag
 
 logger = logging.getLogger(__name__)
 
@@ -16,19 +18,24 @@ class ExperimentConfigurationRequestor:
     def __init__(
         self,
         http_client: HttpClient,
-        flag_config_store: ConfigurationStore[Flag],
-        bandit_config_store: ConfigurationStore[BanditData],
+        flag_config_store: ConfigurationStore[CompiledFlag],
+        bandit_config_store: ConfigurationStore[CompiledBandit],
     ):
         self.__http_client = http_client
         self.__flag_config_store = flag_config_store
         self.__bandit_config_store = bandit_config_store
 
-    def get_configuration(self, flag_key: str) -> Optional[Flag]:
+    def get_configuration(self, flag_key: str) -> Optional[CompiledFlag]:
         if self.__http_client.is_unauthorized():
             raise ValueError("Unauthorized: please check your API key")
         return self.__flag_config_store.get_configuration(flag_key)
 
-    def get_bandit_model(self, bandit_key: str) -> Optional[BanditData]:
+    def get_configurations(self) -> Dict[str, CompiledFlag]:
+        if self.__http_client.is_unauthorized():
+            raise ValueError("Unauthorized: please check your API key")
+        return self.__flag_config_store.get_configurations()
+
+    def get_bandit_model(self, bandit_key: str) -> Optional[CompiledBandit]:
         if self.__http_client.is_unauthorized():
             raise ValueError("Unauthorized: please check your API key")
         return self.__bandit_config_store.get_configuration(bandit_key)
@@ -36,8 +43,12 @@ class ExperimentConfigurationRequestor:
     def get_flag_keys(self):
         return self.__flag_config_store.get_keys()
 
-    def get_flag_configurations(self):
-        return self.__flag_config_store.get_configurations()
+    def get_flag_configurations(self) -> Dict[str, Flag]:
+        compiled_flags = self.__flag_config_store.get_configurations()
+        return {
+            key: compiled_flag.to_flag()
+            for key, compiled_flag in compiled_flags.items()
+        }
 
     def get_bandit_keys(self):
         return self.__bandit_config_store.get_keys()
@@ -51,7 +62,11 @@ class ExperimentConfigurationRequestor:
     def store_flags(self, flag_data) -> Dict[str, Flag]:
         flag_config_dict = cast(dict, flag_data.get("flags", {}))
         flag_configs = {key: Flag(**config) for key, config in flag_config_dict.items()}
-        self.__flag_config_store.set_configurations(flag_configs)
+        bandit_variations = {
+            key: [BanditVariation(**variation) for variation in variations]
+            for key, variations in cast(dict, flag_data.get("bandits", {})).items()
+        }
+        self.__set_flags(flag_configs, bandit_variations)
         return flag_configs
 
     def store_bandits(self, bandit_data) -> Dict[str, BanditData]:
@@ -59,7 +74,10 @@ class ExperimentConfigurationRequestor:
             key: BanditData(**data)
             for key, data in cast(dict, bandit_data.get("bandits", {})).items()
         }
-        self.__bandit_config_store.set_configurations(bandit_configs)
+        # compile the scoring plans before swapping them in
+        self.__bandit_config_store.set_configurations(
+            {key: compile_bandit(bandit) for key, bandit in bandit_configs.items()}
+        )
         return bandit_configs
 
     def fetch_and_store_configurations(self):
@@ -77,6 +95,27 @@ class ExperimentConfigurationRequestor:
         return self.__flag_config_store.is_initialized()
 
     def _set_configuration(self, configuration: Configuration):
+        self.__set_flags(
+            configuration._flags_configuration.flags,
+            configuration._flags_configuration.bandits,
+        )
+
+    def __set_flags(
+        self,
+        flag_configs: Dict[str, Flag],
+        bandit_variations: Dict[str, List[BanditVariation]],
+    ):
+        bandit_keys: Dict[str, Dict[str, str]] = {}
+        for variations in bandit_variations.values():
+            for variation in variations:
+                bandit_keys.setdefault(variation.flag_key, {})[
+                    variation.variation_value
+                ] = variation.key
+        # compile the evaluation plans before swapping them in, each with its
+        # bandit keys so that both are published at once
         self.__flag_config_store.set_configurations(
-            configuration._flags_configuration.flags
+            {
+                key: compile_flag(flag, bandit_keys.get(key))
+                for key, flag in flag_configs.items()
+            }
         )
@@ -4,3 +4,6 @@
 # Please change this to 30 seconds when ready to bump to 4.0.
 POLL_JITTER_SECONDS_DEFAULT = 30  # 30 seconds
 POLL_INTERVAL_SECONDS_DEFAULT = 5 * 60  # 5 minutes
+
+# diagnostics
+DIAGNOSTICS_INTERVAL_SECONDS_DEFAULT = 60  # 1 minute
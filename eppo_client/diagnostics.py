@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Keys listed in a summary line, most frequent first.
+MAX_SUMMARY_KEYS = 5
+
+# Distinct (message, key) pairs that are counted separately. Keys come from
+# the caller, e.g. flag keys built at runtime, so occurrences about further
+# keys are counted under OTHER_KEY.
+MAX_KEYS = 1000
+OTHER_KEY = "other"
+
+
+class Diagnostics:
+    """
+    Counts the SDK's recurring diagnostics, such as a missing flag, and
+    rate-limits the log lines they produce.
+
+    Each diagnostic is a message about a key, usually a flag key. Within every
+    interval, the first ``max_per_interval`` occurrences of a message about a
+    key are logged; the others are only counted, and reported in one summary
+    line per message once the interval is over: on the next report, or when
+    ``flush_if_due`` is called, which the client does on every configuration
+    poll. Without an interval, every occurrence is logged.
+    """
+
+    __slots__ = (
+        "__logger",
+        "__interval_seconds",
+        "__max_per_interval",
+        "__clock",
+        "__lock",
+        "__totals",
+        "__interval_counts",
+        "__interval_start",
+    )
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        interval_seconds: Optional[float],
+        max_per_interval: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.__logger = logger
+        self.__interval_seconds = interval_seconds
+        self.__max_per_interval = max_per_interval
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        # occurrences since the start, by message and key
+        self.__totals: Dict[Tuple[str, str], int] = {}
+        # occurrences in the current interval, by level, message and key
+        self.__interval_counts: Dict[Tuple[int, str, str], int] = {}
+        self.__interval_start = clock()
+
+    def report(
+        self, level: int, message: str, key: str, detail: Optional[str] = None
+    ) -> None:
+        """Counts an occurrence of the message about key, and logs it unless
+        rate-limited, as "[Eppo SDK] message: detail" (the key by default).
+        """
+        summary: List[Tuple[int, str]] = []
+        with self.__lock:
+            counted_key = key
+            if (message, key) not in self.__totals and len(self.__totals) >= MAX_KEYS:
+                counted_key = OTHER_KEY
+            total_key = (message, counted_key)
+            self.__totals[total_key] = self.__totals.get(total_key, 0) + 1
+            if not self.__interval_seconds:
+                should_log = True
+            else:
+                now = self.__clock()
+                if now - self.__interval_start >= self.__interval_seconds:
+                    summary = self.__end_interval(now)
+                interval_key = (level, message, counted_key)
+                count = self.__interval_counts.get(interval_key, 0) + 1
+                self.__interval_counts[interval_key] = count
+                should_log = count <= self.__max_per_interval
+
+        for summary_level, line in summary:
+            self.__logger.log(summary_level, line)
+        if should_log and self.__logger.isEnabledFor(level):
+            self.__logger.log(
+                level, f"[Eppo SDK] {message}: {key if detail is None else detail}"
+            )
+
+    def flush(self) -> None:
+        """Logs the summary of the current interval and starts a new one."""
+        with self.__lock:
+            summary = self.__end_interval(self.__clock())
+        for level, line in summary:
+            self.__logger.log(level, line)
+
+    def flush_if_due(self) -> None:
+        """Logs the summary of the current interval if it is over, so that
+        diagnostics that stopped being reported are summarized too.
+        """
+        if not self.__interval_seconds:
+            return
+        with self.__lock:
+            now = self.__clock()
+            if now - self.__interval_start < self.__interval_seconds:
+                return
+            summary = self.__end_interval(now)
+        for level, line in summary:
+            self.__logger.log(level, line)
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Returns the number of occurrences of each (message, key) so far,
+        with the keys beyond MAX_KEYS counted under OTHER_KEY.
+        """
+        with self.__lock:
+            return dict(self.__totals)
+
+    def __end_interval(self, now: float) -> List[Tuple[int, str]]:
+        elapsed = now - self.__interval_start
+        suppressed: Dict[Tuple[int, str], Dict[str, int]] = {}
+        for (level, message, key), count in self.__interval_counts.items():
+            if count > self.__max_per_interval:
+                suppressed.setdefault((level, message), {})[key] = (
+                    count - self.__max_per_interval
+                )
+        self.__interval_counts = {}
+        self.__interval_start = now
+
+        summary = []
+        for (level, message), counts_by_key in suppressed.items():
+            keys = sorted(counts_by_key, key=lambda key: -counts_by_key[key])
+            listed = ", ".join(
+                f"{key}: {counts_by_key[key]}" for key in keys[:MAX_SUMMARY_KEYS]
+            )
+            if len(keys) > MAX_SUMMARY_KEYS:
+                listed += f" and {len(keys) - MAX_SUMMARY_KEYS} more"
+            summary.append(
+                (
+                    level,
+                    f"[Eppo SDK] {message}: {sum(counts_by_key.values())} more"
+                    f" times in the last {elapsed:.0f}s ({listed})",
+                )
+            )
+        return summary
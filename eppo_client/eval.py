@@ -1,66 +1,482 @@
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+from eppo_client.allocation_index import AllocationIndex
+from eppo_client.json_values import JsonValue, parse_json_value
 from eppo_client.sharders import Sharder
-from eppo_client.models import Flag, Range, Shard, Variation, VariationType
-from eppo_client.rules import matches_rule
+from eppo_client.models import Flag, Range, Shard, Split, Variation, VariationType
+from eppo_client.rules import (
+    CompiledRule,
+    SubjectAttributesView,
+    compile_rule,
+    matches_rule,
+)
 from dataclasses import dataclass
+from enum import Enum
 import datetime
+import json
+import logging
+import math
+import time
 
-from eppo_client.types import Attributes
+from eppo_client.types import Attributes, AttributeType, ValueType
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(frozen=True, init=False)
 class FlagEvaluation:
+    """
+    The result of evaluating a flag for a subject. Immutable, and slotted to
+    keep the one allocated per evaluation small.
+    """
+
+    __slots__ = (
+        "flag_key",
+        "variation_type",
+        "subject_key",
+        "subject_attributes",
+        "allocation_key",
+        "variation",
+        "extra_logging",
+        "do_log",
+        # the parsed variation value, for JSON flags; not a field
+        "_json_value",
+    )
+
     flag_key: str
     variation_type: VariationType
     subject_key: str
     subject_attributes: Attributes
     allocation_key: Optional[str]
     variation: Optional[Variation]
+    extra_logging: Mapping[str, str]
+    do_log: bool
+    if TYPE_CHECKING:
+        _json_value: Optional[JsonValue]
+
+    def __init__(
+        self,
+        flag_key: str,
+        variation_type: VariationType,
+        subject_key: str,
+        subject_attributes: Attributes,
+        allocation_key: Optional[str],
+        variation: Optional[Variation],
+        extra_logging: Mapping[str, str],
+        do_log: bool,
+        *,
+        json_value: Optional[JsonValue] = None,
+    ):
+        # frozen, so the fields are set like in a generated __init__
+        set_attribute = object.__setattr__
+        set_attribute(self, "flag_key", flag_key)
+        set_attribute(self, "variation_type", variation_type)
+        set_attribute(self, "subject_key", subject_key)
+        set_attribute(self, "subject_attributes", subject_attributes)
+        set_attribute(self, "allocation_key", allocation_key)
+        set_attribute(self, "variation", variation)
+        set_attribute(self, "extra_logging", extra_logging)
+        set_attribute(self, "do_log", do_log)
+        set_attribute(self, "_json_value", json_value)
+
+    @property
+    def json_value(self) -> Optional[JsonValue]:
+        """The parsed variation value, for JSON flags; None otherwise."""
+        return self._json_value
+
+    # frozen, so copy and pickle need to restore the slots like __init__ does
+    def __getstate__(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
+class _EmptyExtraLogging(Dict[str, str]):
+    """An empty dict that cannot be modified."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("extra_logging is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+# Shared by all the evaluations that did not match a split, most of them
+NO_EXTRA_LOGGING: Mapping[str, str] = _EmptyExtraLogging()
+
+
+class CompiledShard(NamedTuple):
+    """
+    A shard whose ranges are flattened into a bitmap with one bit per shard
+    value, so that membership is a single lookup however fragmented the
+    ranges are.
+    """
+
+    salt: str
+    bitmap: bytes
+
+    def contains(self, shard_value: int) -> bool:
+        index = shard_value >> 3
+        return 0 <= index < len(self.bitmap) and bool(
+            self.bitmap[index] >> (shard_value & 7) & 1
+        )
+
+    def is_empty(self) -> bool:
+        return not any(self.bitmap)
+
+    def covers(self, total_shards: int) -> bool:
+        full_mask = (1 << total_shards) - 1
+        return (
+            total_shards > 0
+            and int.from_bytes(self.bitmap, "little") & full_mask == full_mask
+        )
+
+
+def compile_shard(shard: Shard, total_shards: int) -> CompiledShard:
+    return CompiledShard(
+        salt=shard.salt,
+        bitmap=shard_bitmap(
+            total_shards, tuple((range.start, range.end) for range in shard.ranges)
+        ),
+    )
+
+
+@lru_cache(maxsize=1024)
+def shard_bitmap(total_shards: int, ranges: Tuple[Tuple[int, int], ...]) -> bytes:
+    # Memoized so that shards with the same ranges share a bitmap, also
+    # across flags and configuration updates.
+    size = max([total_shards, *(end for _, end in ranges)])
+    bits = 0
+    for start, end in ranges:
+        start = max(start, 0)
+        if start < end:
+            bits |= ((1 << (end - start)) - 1) << start
+    return bits.to_bytes((size + 7) // 8, "little")
+
+
+class CompiledSplit(NamedTuple):
+    shards: Tuple[CompiledShard, ...]
+    variation: Optional[Variation]
     extra_logging: Dict[str, str]
+    # the parsed variation value, for JSON flags
+    json_value: Optional[JsonValue] = None
+    # False if the variation value does not match the variation type
+    valid: bool = True
+
+
+class CompiledAllocation(NamedTuple):
+    key: str
+    rules: Tuple[CompiledRule, ...]
+    start_at: Optional[datetime.datetime]
+    end_at: Optional[datetime.datetime]
+    splits: Tuple[CompiledSplit, ...]
     do_log: bool
 
 
+class AllocationSchedule:
+    """
+    Tracks which allocations are active given their start_at/end_at.
+
+    The active set only changes when the clock crosses one of those dates, so
+    it is recomputed when the next one is due (checked against the monotonic
+    clock) rather than comparing dates on every evaluation.
+    """
+
+    __slots__ = ("__windows", "__state")
+
+    def __init__(
+        self,
+        windows: Sequence[
+            Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]
+        ],
+    ):
+        self.__windows = windows
+        always_active = tuple(True for _ in windows)
+        if any(start_at or end_at for start_at, end_at in windows):
+            # (refresh deadline on the monotonic clock, active flags)
+            self.__state = (-math.inf, always_active)
+        else:
+            self.__state = (math.inf, always_active)
+
+    def active(self) -> Tuple[bool, ...]:
+        refresh_at, active = self.__state
+        if time.monotonic() >= refresh_at:
+            active = self.__refresh()
+        return active
+
+    def __refresh(self) -> Tuple[bool, ...]:
+        now = utcnow()
+        active = tuple(
+            not (start_at and now < start_at) and not (end_at and now > end_at)
+            for start_at, end_at in self.__windows
+        )
+        # an allocation becomes active at start_at, and inactive right after end_at
+        changes = [
+            start_at for start_at, _ in self.__windows if start_at and now < start_at
+        ]
+        changes += [
+            end_at + datetime.timedelta(microseconds=1)
+            for _, end_at in self.__windows
+            if end_at and now <= end_at
+        ]
+        refresh_at = (
+            time.monotonic() + (min(changes) - now).total_seconds()
+            if changes
+            else math.inf
+        )
+        self.__state = (refresh_at, active)
+        return active
+
+
+class CompiledFlag(NamedTuple):
+    """
+    Evaluation plan for a flag, built once when the configuration is stored.
+
+    Rules have their operators resolved and splits have their variations
+    bound, so evaluating the plan does not have to walk the pydantic models.
+    The allocation index tells which allocations a subject may match and the
+    schedule which of them are currently active.
+    The source model is kept serialized, for exporting the configuration,
+    rather than as a tree of pydantic models; ``to_flag`` parses it back.
+    Bandit keys, by variation value, come from the bandits section of the
+    same configuration and are stored with the flag, so that the two are
+    always read together.
+    """
+
+    key: str
+    enabled: bool
+    variation_type: VariationType
+    total_shards: int
+    allocations: Tuple[CompiledAllocation, ...]
+    allocation_index: AllocationIndex
+    schedule: AllocationSchedule
+    variations: Tuple[Variation, ...]
+    source: bytes
+    bandit_keys: Mapping[str, str]
+
+    def to_flag(self) -> Flag:
+        return Flag.model_validate(json.loads(self.source))
+
+
+def compile_flag(
+    flag: Flag, bandit_keys: Optional[Mapping[str, str]] = None
+) -> CompiledFlag:
+    variations = compile_variations(flag)
+    allocations = tuple(
+        CompiledAllocation(
+            key=allocation.key,
+            rules=tuple(compile_rule(rule) for rule in allocation.rules),
+            start_at=allocation.start_at,
+            end_at=allocation.end_at,
+            splits=tuple(
+                compiled_split
+                for compiled_split in (
+                    compile_split(split, flag, variations)
+                    for split in allocation.splits
+                )
+                if compiled_split is not None
+            ),
+            do_log=allocation.do_log,
+        )
+        for allocation in flag.allocations
+    )
+    return CompiledFlag(
+        key=flag.key,
+        enabled=flag.enabled,
+        variation_type=flag.variation_type,
+        total_shards=flag.total_shards,
+        allocations=allocations,
+        # indexed by the source rules, which have the condition values
+        allocation_index=AllocationIndex(
+            [allocation.rules for allocation in flag.allocations]
+        ),
+        schedule=AllocationSchedule(
+            [(allocation.start_at, allocation.end_at) for allocation in allocations]
+        ),
+        variations=tuple(flag.variations.values()),
+        source=_serialize_flag(flag),
+        bandit_keys={} if bandit_keys is None else bandit_keys,
+    )
+
+
+def _serialize_flag(flag: Flag) -> bytes:
+    """
+    Serializes a flag for CompiledFlag.to_flag. The models are dumped to
+    Python objects first, as pydantic serializes union values such as True or
+    1.0 to JSON as 1.
+    """
+    return json.dumps(
+        flag.model_dump(by_alias=True), default=_json_default, separators=(",", ":")
+    ).encode()
+
+
+def _json_default(value: object) -> object:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def compile_variations(flag: Flag) -> Dict[str, Optional[JsonValue]]:
+    """
+    Checks the variation values against the variation type of the flag, once
+    for every configuration, and parses them for JSON flags.
+
+    Returns the valid variations, with their parsed value for JSON flags.
+    Invalid variations are reported and left out.
+    """
+    variations: Dict[str, Optional[JsonValue]] = {}
+    for key, variation in flag.variations.items():
+        if not check_value_type_match(flag.variation_type, variation.value):
+            logger.error(
+                "[Eppo SDK] Variation value does not have the correct type for the flag: "
+                f"{flag.key} and variation key {key}"
+            )
+        elif flag.variation_type == VariationType.JSON:
+            try:
+                variations[key] = parse_json_value(cast(str, variation.value))
+            except ValueError as e:
+                logger.error(
+                    f"[Eppo SDK] Invalid JSON value for variation {key} of flag {flag.key}: {e}"
+                )
+        else:
+            variations[key] = None
+    return variations
+
+
+def compile_split(
+    split: Split,
+    flag: Flag,
+    variations: Optional[Dict[str, Optional[JsonValue]]] = None,
+) -> Optional[CompiledSplit]:
+    """
+    Returns None for a split that no subject can match. Shards that cover
+    every shard value are left out, so that splits of a full rollout match
+    without hashing the subject.
+    """
+    shards = []
+    for shard in split.shards:
+        compiled_shard = compile_shard(shard, flag.total_shards)
+        if compiled_shard.is_empty():
+            return None
+        if not compiled_shard.covers(flag.total_shards):
+            shards.append(compiled_shard)
+
+    if variations is None:
+        variations = compile_variations(flag)
+    variation = flag.variations.get(split.variation_key)
+    return CompiledSplit(
+        shards=tuple(shards),
+        variation=variation,
+        extra_logging=split.extra_logging,
+        json_value=variations.get(split.variation_key),
+        valid=variation is None or split.variation_key in variations,
+    )
+
+
 @dataclass
 class Evaluator:
     sharder: Sharder
 
     def evaluate_flag(
         self,
-        flag: Flag,
+        flag: Union[CompiledFlag, Flag],
+        subject_key: str,
+        subject_attributes: Attributes,
+    ) -> FlagEvaluation:
+        return self.__evaluate(
+            flag,
+            subject_key,
+            subject_attributes,
+            SubjectAttributesView(subject_key, subject_attributes),
+        )
+
+    def evaluate_flags(
+        self,
+        flags: Iterable[Union[CompiledFlag, Flag]],
+        subject_key: str,
+        subject_attributes: Attributes,
+    ) -> List[FlagEvaluation]:
+        """
+        Evaluates several flags for the same subject. The subject attributes
+        are prepared once and shared by all the flags.
+        """
+        attributes = SubjectAttributesView(subject_key, subject_attributes)
+        return [
+            self.__evaluate(flag, subject_key, subject_attributes, attributes)
+            for flag in flags
+        ]
+
+    def __evaluate(
+        self,
+        flag: Union[CompiledFlag, Flag],
         subject_key: str,
         subject_attributes: Attributes,
+        attributes: SubjectAttributesView,
     ) -> FlagEvaluation:
+        if isinstance(flag, Flag):
+            flag = compile_flag(flag)
+
         if not flag.enabled:
             return none_result(
                 flag.key, flag.variation_type, subject_key, subject_attributes
             )
 
-        now = utcnow()
-        for allocation in flag.allocations:
+        active = flag.schedule.active()
+        candidates = flag.allocation_index.candidates(attributes)
+        for position in candidates:
             # Skip allocations that are not active
-            if allocation.start_at and now < allocation.start_at:
-                continue
-            if allocation.end_at and now > allocation.end_at:
+            if not active[position]:
                 continue
 
-            if matches_rules(
-                allocation.rules, {"id": subject_key, **subject_attributes}
-            ):
+            allocation = flag.allocations[position]
+
+            if matches_compiled_rules(allocation.rules, attributes):
                 for split in allocation.splits:
                     # Split needs to match all shards
-                    if all(
-                        self.matches_shard(shard, subject_key, flag.total_shards)
+                    if not split.shards or all(
+                        shard.contains(
+                            self.sharder.get_shard(
+                                hash_key(shard.salt, subject_key), flag.total_shards
+                            )
+                        )
                         for shard in split.shards
                     ):
+                        if not split.valid:
+                            # reported when the configuration was loaded
+                            return none_result(
+                                flag.key,
+                                flag.variation_type,
+                                subject_key,
+                                subject_attributes,
+                            )
                         return FlagEvaluation(
                             flag_key=flag.key,
                             variation_type=flag.variation_type,
                             subject_key=subject_key,
                             subject_attributes=subject_attributes,
                             allocation_key=allocation.key,
-                            variation=flag.variations.get(split.variation_key),
+                            variation=split.variation,
                             extra_logging=split.extra_logging,
                             do_log=allocation.do_log,
+                            json_value=split.json_value,
                         )
 
         # No allocations matched, return the None result
@@ -68,10 +484,17 @@ class Evaluator:
             flag.key, flag.variation_type, subject_key, subject_attributes
         )
 
-    def matches_shard(self, shard: Shard, subject_key: str, total_shards: int) -> bool:
+    def matches_shard(
+        self,
+        shard: Union[CompiledShard, Shard],
+        subject_key: str,
+        total_shards: int,
+    ) -> bool:
         assert total_shards > 0, "Expect total_shards to be strictly positive"
+        if isinstance(shard, Shard):
+            shard = compile_shard(shard, total_shards)
         h = self.sharder.get_shard(hash_key(shard.salt, subject_key), total_shards)
-        return any(is_in_shard_range(h, r) for r in shard.ranges)
+        return shard.contains(h)
 
 
 def is_in_shard_range(shard: int, range: Range) -> bool:
@@ -89,6 +512,12 @@ def matches_rules(rules, subject_attributes):
     return not rules or any(matches_rule(rule, subject_attributes) for rule in rules)
 
 
+def matches_compiled_rules(
+    rules: Tuple[CompiledRule, ...], subject_attributes: Mapping[str, AttributeType]
+) -> bool:
+    return not rules or any(rule.matches(subject_attributes) for rule in rules)
+
+
 def none_result(
     flag_key: str,
     variation_type: VariationType,
@@ -102,10 +531,27 @@ def none_result(
         subject_attributes=subject_attributes,
         allocation_key=None,
         variation=None,
-        extra_logging={},
+        extra_logging=NO_EXTRA_LOGGING,
         do_log=False,
     )
 
 
 def utcnow() -> datetime.datetime:
     return datetime.datetime.now(datetime.timezone.utc)
+
+
+def check_value_type_match(
+    expected_type: Optional[VariationType], value: ValueType
+) -> bool:
+    if expected_type is None:
+        return True
+    if expected_type in [VariationType.JSON, VariationType.STRING]:
+        return isinstance(value, str)
+    if expected_type == VariationType.INTEGER:
+        return isinstance(value, int)
+    if expected_type == VariationType.NUMERIC:
+        # we can convert int to float
+        return isinstance(value, float) or isinstance(value, int)
+    if expected_type == VariationType.BOOLEAN:
+        return isinstance(value, bool)
+    return False
@@ -0,0 +1,44 @@
+import json
+import marshal
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+
+class JsonValue(NamedTuple):
+    """
+    A JSON variation value, parsed once when the configuration is loaded.
+
+    ``view`` is a read-only view of the parsed value, shared by all callers:
+    objects are mappingproxies and arrays are tuples. ``copy()`` returns a
+    fresh, mutable copy, which is faster than parsing the JSON again.
+    """
+
+    view: Any
+    serialized: bytes
+
+    def copy(self) -> Any:
+        # marshal handles exactly the types JSON parses into, and is only
+        # ever fed bytes serialized by this process
+        return marshal.loads(self.serialized)
+
+    def __reduce__(self):
+        # the view holds mappingproxies, which cannot be pickled
+        return _load_json_value, (self.serialized,)
+
+
+def parse_json_value(json_string: str) -> JsonValue:
+    """Raises ValueError if json_string is not valid JSON."""
+    value = json.loads(json_string)
+    return JsonValue(view=_freeze(value), serialized=marshal.dumps(value))
+
+
+def _load_json_value(serialized: bytes) -> JsonValue:
+    return JsonValue(view=_freeze(marshal.loads(serialized)), serialized=serialized)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
@@ -55,10 +55,6 @@ class Flag(SdkBaseModel):
     total_shards: int = 10_000
 
 
-class UfcResponse(SdkBaseModel):
-    flags: Dict[str, Flag]
-
-
 class BanditVariation(SdkBaseModel):
     key: str
     flag_key: str
@@ -66,6 +62,12 @@ class BanditVariation(SdkBaseModel):
     variation_value: str
 
 
+class UfcResponse(SdkBaseModel):
+    flags: Dict[str, Flag]
+    # the flag variations of each bandit, by bandit key
+    bandits: Dict[str, List[BanditVariation]] = {}
+
+
 class BanditNumericAttributeCoefficient(SdkBaseModel):
     attribute_key: str
     coefficient: float
@@ -34,5 +34,6 @@ class Poller:
             self._wait_for_interval()
 
     def _wait_for_interval(self):
-        interval_with_jitter = self.__interval - randrange(0, self.__jitter_millis)
+        jitter = randrange(0, self.__jitter_millis) if self.__jitter_millis else 0
+        interval_with_jitter = self.__interval - jitter
         self.__stop_event.wait(interval_with_jitter / 1000)
@@ -1,14 +1,33 @@
 import json
+import logging
 import numbers
+import operator
 import re
 from enum import Enum
-from typing import Any, List
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 import semver
 
 from eppo_client.models import SdkBaseModel
 from eppo_client.types import AttributeType, ConditionValueType, Attributes
 
+logger = logging.getLogger(__name__)
+
+# Subject versions (e.g. app versions) have very few distinct values in
+# practice, so parsed versions are memoized up to this many entries.
+SUBJECT_SEMVER_CACHE_SIZE = 1024
+
 
 class OperatorType(Enum):
     MATCHES = "MATCHES"
@@ -32,93 +51,242 @@ class Rule(SdkBaseModel):
     conditions: List[Condition]
 
 
-def matches_rule(rule: Rule, subject_attributes: Attributes) -> bool:
-    return all(
-        evaluate_condition(condition, subject_attributes)
-        for condition in rule.conditions
+_MISSING = object()
+
+
+class SubjectAttributesView(Mapping[str, AttributeType]):
+    """
+    The attributes rules are evaluated against: the subject attributes plus
+    an ``id`` attribute holding the subject key, unless the subject
+    attributes already have one. Reads through without copying.
+    """
+
+    __slots__ = ("subject_key", "subject_attributes", "__strings")
+
+    def __init__(self, subject_key: str, subject_attributes: Attributes):
+        self.subject_key = subject_key
+        self.subject_attributes = subject_attributes
+        self.__strings: Dict[str, Optional[str]] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.subject_attributes.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key == "id":
+            return self.subject_key
+        return default
+
+    def get_string(self, key: str) -> Optional[str]:
+        """
+        Returns the attribute value as matched by string operators, or None if
+        it is missing. Memoized, as the view may be shared by several flags.
+        """
+        try:
+            return self.__strings[key]
+        except KeyError:
+            value = self.get(key)
+            string = None if value is None else to_string(value)
+            self.__strings[key] = string
+            return string
+
+    def __getitem__(self, key: str) -> AttributeType:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        if "id" not in self.subject_attributes:
+            yield "id"
+        yield from self.subject_attributes
+
+    def __len__(self) -> int:
+        return len(self.subject_attributes) + ("id" not in self.subject_attributes)
+
+
+class CompiledCondition(NamedTuple):
+    """
+    A condition with its operator resolved ahead of time: ``test`` is a
+    predicate on the subject value that needs no further dispatch. Operators
+    in STRING_OPERATORS are tested on the string form of the subject value.
+    """
+
+    operator: OperatorType
+    attribute: Any
+    test: Callable[[Any], bool]
+    string_operand: bool = False
+
+    def matches(self, subject_attributes: Mapping[str, AttributeType]) -> bool:
+        if self.string_operand:
+            return self.test(subject_string(subject_attributes, self.attribute))
+        return self.test(subject_attributes.get(self.attribute, None))
+
+
+class CompiledRule(NamedTuple):
+    conditions: Tuple[CompiledCondition, ...]
+
+    def matches(self, subject_attributes: Mapping[str, AttributeType]) -> bool:
+        return all(
+            condition.matches(subject_attributes) for condition in self.conditions
+        )
+
+
+def compile_rule(rule: Rule) -> CompiledRule:
+    return CompiledRule(
+        conditions=tuple(compile_condition(condition) for condition in rule.conditions)
     )
 
 
-def evaluate_condition(condition: Condition, subject_attributes: Attributes) -> bool:
-    subject_value = subject_attributes.get(condition.attribute, None)
-    if condition.operator == OperatorType.IS_NULL:
-        if condition.value:
-            return subject_value is None
-        return subject_value is not None
-
-    if subject_value is not None:
-        if condition.operator == OperatorType.MATCHES:
-            return isinstance(condition.value, str) and bool(
-                re.search(condition.value, to_string(subject_value))
-            )
-        elif condition.operator == OperatorType.NOT_MATCHES:
-            return isinstance(condition.value, str) and not bool(
-                re.search(condition.value, to_string(subject_value))
-            )
-        elif condition.operator == OperatorType.ONE_OF:
-            return isinstance(condition.value, list) and to_string(subject_value) in [
-                str(value) for value in condition.value
-            ]
-        elif condition.operator == OperatorType.NOT_ONE_OF:
-            return isinstance(condition.value, list) and to_string(
-                subject_value
-            ) not in [str(value) for value in condition.value]
-        else:
-            # Numeric operator: value could be numeric or semver.
-            if isinstance(subject_value, numbers.Number):
-                return evaluate_numeric_condition(subject_value, condition)
-            elif isinstance(subject_value, str) and is_valid_semver(subject_value):
-                return compare_semver(
-                    subject_value, condition.value, condition.operator
-                )
+def compile_condition(condition: Condition) -> CompiledCondition:
+    compile_test = CONDITION_COMPILERS[condition.operator]
+    try:
+        test = compile_test(condition.operator, condition.value)
+    except re.error as e:
+        # an invalid pattern can never match; report it once, at load time
+        logger.warning(
+            f"[Eppo SDK] Invalid regular expression for attribute {condition.attribute}: "
+            f"{condition.value} ({e})"
+        )
+        test = _never
+    return CompiledCondition(
+        operator=condition.operator,
+        attribute=condition.attribute,
+        test=test,
+        string_operand=condition.operator in STRING_OPERATORS,
+    )
+
+
+def subject_string(
+    subject_attributes: Mapping[str, AttributeType], attribute: Any
+) -> Optional[str]:
+    if isinstance(subject_attributes, SubjectAttributesView):
+        return subject_attributes.get_string(attribute)
+    value = subject_attributes.get(attribute, None)
+    return None if value is None else to_string(value)
+
+
+def _never(subject_value: Any) -> bool:
     return False
 
 
-def evaluate_numeric_condition(
-    subject_value: numbers.Number, condition: Condition
-) -> bool:
-    if not isinstance(condition.value, numbers.Number):
-        # this ensures we are comparing numbers to numbers below
-        # but mypy is not smart enough to tell, so we ignore types below
+def _compile_is_null(
+    operator_type: OperatorType, value: ConditionValueType
+) -> Callable[[AttributeType], bool]:
+    if value:
+        return lambda subject_value: subject_value is None
+    return lambda subject_value: subject_value is not None
+
+
+def _compile_matches(
+    operator_type: OperatorType, value: ConditionValueType
+) -> Callable[[Optional[str]], bool]:
+    if not isinstance(value, str):
+        return _never
+    search = re.compile(value).search
+    expected = operator_type == OperatorType.MATCHES
+    return lambda subject_string: subject_string is not None and expected == bool(
+        search(subject_string)
+    )
+
+
+def _compile_one_of(
+    operator_type: OperatorType, value: ConditionValueType
+) -> Callable[[Optional[str]], bool]:
+    if not isinstance(value, list):
+        return _never
+    values = frozenset(str(item) for item in value)
+    expected = operator_type == OperatorType.ONE_OF
+    return lambda subject_string: subject_string is not None and expected == (
+        subject_string in values
+    )
+
+
+def _compile_comparison(
+    operator_type: OperatorType, value: ConditionValueType
+) -> Callable[[AttributeType], bool]:
+    # Numeric operator: value could be numeric or semver.
+    compare = NUMERIC_COMPARATORS[operator_type]
+    is_numeric = isinstance(value, numbers.Number)
+    condition_version = parse_semver(value) if isinstance(value, str) else None
+
+    def test(subject_value: AttributeType) -> bool:
+        if isinstance(subject_value, numbers.Number):
+            return is_numeric and compare(subject_value, value)
+        elif condition_version is not None and isinstance(subject_value, str):
+            subject_version = parse_subject_semver(subject_value)
+            return subject_version is not None and compare(
+                subject_version, condition_version
+            )
         return False
-    elif condition.operator == OperatorType.GT:
-        return subject_value > condition.value  # type: ignore
-    elif condition.operator == OperatorType.GTE:
-        return subject_value >= condition.value  # type: ignore
-    elif condition.operator == OperatorType.LT:
-        return subject_value < condition.value  # type: ignore
-    elif condition.operator == OperatorType.LTE:
-        return subject_value <= condition.value  # type: ignore
 
-    return False
+    return test
 
 
-def is_valid_semver(value: str) -> bool:
+NUMERIC_COMPARATORS: Dict[OperatorType, Callable[[Any, Any], bool]] = {
+    OperatorType.GT: operator.gt,
+    OperatorType.GTE: operator.ge,
+    OperatorType.LT: operator.lt,
+    OperatorType.LTE: operator.le,
+}
+
+STRING_OPERATORS = frozenset(
+    (
+        OperatorType.MATCHES,
+        OperatorType.NOT_MATCHES,
+        OperatorType.ONE_OF,
+        OperatorType.NOT_ONE_OF,
+    )
+)
+
+CONDITION_COMPILERS: Dict[
+    OperatorType,
+    Callable[[OperatorType, ConditionValueType], Callable[[Any], bool]],
+] = {
+    OperatorType.IS_NULL: _compile_is_null,
+    OperatorType.MATCHES: _compile_matches,
+    OperatorType.NOT_MATCHES: _compile_matches,
+    OperatorType.ONE_OF: _compile_one_of,
+    OperatorType.NOT_ONE_OF: _compile_one_of,
+    OperatorType.GT: _compile_comparison,
+    OperatorType.GTE: _compile_comparison,
+    OperatorType.LT: _compile_comparison,
+    OperatorType.LTE: _compile_comparison,
+}
+
+
+def matches_rule(rule: Rule, subject_attributes: Attributes) -> bool:
+    return compile_rule(rule).matches(subject_attributes)
+
+
+def evaluate_condition(condition: Condition, subject_attributes: Attributes) -> bool:
+    return compile_condition(condition).matches(subject_attributes)
+
+
+def parse_semver(value: str) -> Optional[semver.Version]:
     try:
-        # Parse the string. If it's a valid semver, it will return without errors.
-        semver.VersionInfo.parse(value)
-        return True
+        return semver.Version.parse(value)
     except ValueError:
         # If a ValueError is raised, the string is not a valid semver.
-        return False
+        return None
+
+
+parse_subject_semver = lru_cache(maxsize=SUBJECT_SEMVER_CACHE_SIZE)(parse_semver)
+
+
+def is_valid_semver(value: str) -> bool:
+    return parse_subject_semver(value) is not None
 
 
 def compare_semver(
     attribute_value: Any, condition_value: Any, operator: OperatorType
 ) -> bool:
-    if not is_valid_semver(attribute_value) or not is_valid_semver(condition_value):
+    attribute_version = parse_subject_semver(attribute_value)
+    condition_version = parse_semver(condition_value)
+    if attribute_version is None or condition_version is None:
         return False
 
-    if operator == OperatorType.GT:
-        return semver.compare(attribute_value, condition_value) > 0
-    elif operator == OperatorType.GTE:
-        return semver.compare(attribute_value, condition_value) >= 0
-    elif operator == OperatorType.LT:
-        return semver.compare(attribute_value, condition_value) < 0
-    elif operator == OperatorType.LTE:
-        return semver.compare(attribute_value, condition_value) <= 0
-
-    return False
+    compare = NUMERIC_COMPARATORS.get(operator)
+    return compare is not None and compare(attribute_version, condition_version)
 
 
 def to_string(value: AttributeType) -> str:
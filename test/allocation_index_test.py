@@ -0,0 +1,143 @@
+from eppo_client.allocation_index import AllocationIndex, MIN_ALLOCATIONS_TO_INDEX
+from eppo_client.rules import (
+    Condition,
+    OperatorType,
+    Rule,
+    SubjectAttributesView,
+)
+
+
+def candidates(index, subject_key, subject_attributes):
+    return list(
+        index.candidates(SubjectAttributesView(subject_key, subject_attributes))
+    )
+
+
+def one_of_rules(attribute, *values):
+    return (
+        Rule(
+            conditions=[
+                Condition(
+                    operator=OperatorType.ONE_OF,
+                    attribute=attribute,
+                    value=list(values),
+                )
+            ]
+        ),
+    )
+
+
+def user_overrides(count):
+    return [one_of_rules("id", f"user-{i}") for i in range(count)]
+
+
+def test_small_flags_are_not_indexed():
+    index = AllocationIndex(user_overrides(MIN_ALLOCATIONS_TO_INDEX - 1))
+    assert candidates(index, "user-1", {}) == list(range(MIN_ALLOCATIONS_TO_INDEX - 1))
+
+
+def test_candidates_by_subject_key():
+    index = AllocationIndex(user_overrides(100))
+    assert candidates(index, "user-42", {}) == [42]
+    assert candidates(index, "user-100", {}) == []
+    # an explicit id attribute takes precedence over the subject key
+    assert candidates(index, "user-42", {"id": "user-7"}) == [7]
+
+
+def test_candidates_keep_allocation_order():
+    allocation_rules = user_overrides(10)
+    allocation_rules.insert(3, ())  # catch-all allocation
+    allocation_rules.append(one_of_rules("country", "UK", "US"))
+    allocation_rules.append(one_of_rules("id", "user-5"))
+    index = AllocationIndex(allocation_rules)
+
+    assert candidates(index, "user-5", {"country": "US"}) == [3, 6, 11, 12]
+    assert candidates(index, "user-9", {"country": "FR"}) == [3, 10]
+    assert candidates(index, "user-9", {"country": None}) == [3, 10]
+
+
+def test_candidates_with_several_rules_and_conditions():
+    either_rule = (
+        one_of_rules("country", "UK")[0],
+        Rule(
+            conditions=[
+                Condition(
+                    operator=OperatorType.ONE_OF,
+                    attribute="country",
+                    value=["US", "CA"],
+                ),
+                Condition(operator=OperatorType.GT, attribute="age", value=18),
+            ]
+        ),
+    )
+    not_indexable = (
+        Rule(
+            conditions=[
+                Condition(
+                    operator=OperatorType.NOT_ONE_OF,
+                    attribute="country",
+                    value=["UK"],
+                )
+            ]
+        ),
+    )
+    index = AllocationIndex(user_overrides(8) + [either_rule, not_indexable])
+
+    assert candidates(index, "subject", {"country": "UK"}) == [8, 9]
+    assert candidates(index, "subject", {"country": "CA"}) == [8, 9]
+    assert candidates(index, "subject", {"country": "FR"}) == [9]
+    assert candidates(index, "user-1", {}) == [1, 9]
+
+
+def numeric_rules(attribute, *bounds):
+    return (
+        Rule(
+            conditions=[
+                Condition(operator=operator, attribute=attribute, value=value)
+                for operator, value in bounds
+            ]
+        ),
+    )
+
+
+def test_range_index_tiers():
+    tiers = [
+        numeric_rules(
+            "ltv", (OperatorType.GTE, 100 * i), (OperatorType.LT, 100 * i + 100)
+        )
+        for i in range(10)
+    ]
+    tiers.append(numeric_rules("ltv", (OperatorType.GTE, 1000)))
+    index = AllocationIndex(tiers)
+
+    assert candidates(index, "subject", {"ltv": 0}) == [0]
+    assert candidates(index, "subject", {"ltv": 99.5}) == [0]
+    assert candidates(index, "subject", {"ltv": 100}) == [1]
+    assert candidates(index, "subject", {"ltv": 950}) == [9]
+    assert candidates(index, "subject", {"ltv": 1000}) == [10]
+    assert candidates(index, "subject", {"ltv": 10**9}) == [10]
+    assert candidates(index, "subject", {"ltv": -1}) == []
+    assert candidates(index, "subject", {"ltv": float("nan")}) == []
+    assert candidates(index, "subject", {"ltv": "100"}) == []
+    assert candidates(index, "subject", {}) == []
+
+
+def test_range_index_overlapping_intervals():
+    allocation_rules = user_overrides(6)
+    allocation_rules.append(numeric_rules("age", (OperatorType.GT, 18)))
+    allocation_rules.append(
+        numeric_rules("age", (OperatorType.GTE, 13), (OperatorType.LTE, 18))
+        + numeric_rules("age", (OperatorType.LT, 5))
+    )
+    allocation_rules.append(numeric_rules("age", (OperatorType.GT, 30)))
+    allocation_rules.append(
+        numeric_rules("age", (OperatorType.GT, 40), (OperatorType.LT, 40))
+    )
+    index = AllocationIndex(allocation_rules)
+
+    assert candidates(index, "subject", {"age": 4}) == [7]
+    assert candidates(index, "subject", {"age": 5}) == []
+    assert candidates(index, "subject", {"age": 18}) == [7]
+    assert candidates(index, "subject", {"age": 18.5}) == [6]
+    assert candidates(index, "user-2", {"age": 31}) == [2, 6, 8]
+    assert candidates(index, "subject", {"age": 40}) == [6, 8]
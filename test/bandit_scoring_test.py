@@ -0,0 +1,402 @@
+import random
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from eppo_client import bandit as bandit_module
+from eppo_client.bandit import (
+    ActionCatalog,
+    BanditEvaluator,
+    ContextAttributes,
+    compile_bandit,
+)
+from eppo_client.client import EppoClient
+from eppo_client.models import (
+    BanditCategoricalAttributeCoefficient,
+    BanditCoefficients,
+    BanditData,
+    BanditModelData,
+    BanditNumericAttributeCoefficient,
+)
+from eppo_client.sharders import DeterministicSharder, MD5Sharder
+
+np = pytest.importorskip("numpy")
+
+from eppo_client.bandit_scoring import (  # noqa: E402
+    CompiledBanditModel,
+    compile_bandit_model,
+    sum_rows,
+    weigh_scores,
+)
+from eppo_client.bulk import BulkBanditEvaluator  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def compiled_scoring(monkeypatch):
+    # score every action catalog with the compiled model
+    monkeypatch.setattr(bandit_module, "MIN_CATALOG_ACTIONS_FOR_COMPILED_SCORING", 0)
+
+
+def numeric(attribute_key, coefficient, missing_value_coefficient):
+    return BanditNumericAttributeCoefficient(
+        attribute_key=attribute_key,
+        coefficient=coefficient,
+        missing_value_coefficient=missing_value_coefficient,
+    )
+
+
+def categorical(attribute_key, missing_value_coefficient, **value_coefficients):
+    return BanditCategoricalAttributeCoefficient(
+        attribute_key=attribute_key,
+        missing_value_coefficient=missing_value_coefficient,
+        value_coefficients=value_coefficients,
+    )
+
+
+def make_model(seed, number_of_actions=40):
+    rng = random.Random(seed)
+    coefficients = {}
+    for i in range(number_of_actions):
+        # actions list different attributes, in different orders
+        coefficients[f"action-{i}"] = BanditCoefficients(
+            action_key=f"action-{i}",
+            intercept=rng.uniform(-1, 1),
+            subject_numeric_coefficients=[
+                numeric(key, rng.uniform(-1, 1), rng.uniform(-1, 1))
+                for key in rng.sample(["age", "income", "visits"], rng.randint(0, 3))
+            ],
+            subject_categorical_coefficients=[
+                categorical(
+                    key,
+                    rng.uniform(-1, 1),
+                    **{value: rng.uniform(-1, 1) for value in ["US", "UK", "ios"]},
+                )
+                for key in rng.sample(["country", "os"], rng.randint(0, 2))
+            ],
+            action_numeric_coefficients=[
+                numeric(key, rng.uniform(-1, 1), rng.uniform(-1, 1))
+                for key in rng.sample(["price", "discount"], rng.randint(0, 2))
+            ],
+            action_categorical_coefficients=[
+                categorical("brand", rng.uniform(-1, 1), nike=rng.uniform(-1, 1))
+            ][: rng.randint(0, 1)],
+        )
+    return BanditModelData(
+        gamma=rng.uniform(0, 20),
+        default_action_score=rng.uniform(-1, 1),
+        action_probability_floor=rng.choice([0.0, 0.1]),
+        coefficients=coefficients,
+    )
+
+
+def make_actions(seed, number_of_actions=40):
+    rng = random.Random(seed)
+    actions = {}
+    # some actions are not in the model
+    for i in rng.sample(range(number_of_actions + 5), number_of_actions):
+        actions[f"action-{i}"] = ContextAttributes(
+            numeric_attributes={
+                key: rng.uniform(0, 100)
+                for key in rng.sample(["price", "discount"], rng.randint(0, 2))
+            },
+            categorical_attributes={"brand": rng.choice(["nike", "adidas"])},
+        )
+    return actions
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_compiled_model_matches_action_by_action_evaluation(seed):
+    model = make_model(seed)
+    compiled_model = compile_bandit_model(model)
+    subject_attributes = ContextAttributes(
+        numeric_attributes={"age": 30, "visits": 2.5},
+        categorical_attributes={"country": "UK", "os": "android"},
+    )
+    actions = make_actions(seed)
+    catalog = ActionCatalog(actions)
+    evaluator = BanditEvaluator(sharder=MD5Sharder())
+
+    for subject_key in ["alice", "bob", "charlie"]:
+        expected = evaluator.evaluate_bandit(
+            "flag", subject_key, subject_attributes, actions, model
+        )
+        # exactly the same floats, not just approximately
+        for scored_actions, bandit_model in [
+            (catalog, compiled_model),
+            (catalog, model),
+            (actions, compiled_model),
+        ]:
+            assert (
+                evaluator.evaluate_bandit(
+                    "flag",
+                    subject_key,
+                    subject_attributes,
+                    scored_actions,
+                    bandit_model,
+                )
+                == expected
+            )
+
+
+def test_action_catalog_caches_action_terms_per_model():
+    catalog = ActionCatalog(
+        {"action-1": {"price": 10, "brand": "nike"}, "action-2": {"discount": 0.5}}
+    )
+    assert len(catalog) == 2
+    assert catalog.actions["action-1"] == ContextAttributes(
+        numeric_attributes={"price": 10.0}, categorical_attributes={"brand": "nike"}
+    )
+
+    compiled_model = compile_bandit_model(make_model(0))
+    action_terms = catalog.action_terms(compiled_model)
+    assert catalog.action_terms(compiled_model) is action_terms
+
+    # another version of the model
+    other_model = compile_bandit_model(make_model(1))
+    other_action_terms = catalog.action_terms(other_model)
+    assert other_action_terms is not action_terms
+    assert catalog.action_terms(other_model) is other_action_terms
+    assert catalog.action_terms(compiled_model) is action_terms
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_subject_terms_match_action_by_action_evaluation(seed):
+    model = make_model(seed)
+    compiled_model = compile_bandit_model(model)
+    subject_attributes = ContextAttributes(
+        numeric_attributes={"age": 30, "visits": 2.5},
+        categorical_attributes={"os": "ios"},
+    )
+    subject_terms = compiled_model.score_subject_terms(
+        [subject_attributes.numeric_attributes],
+        [subject_attributes.categorical_attributes],
+    )
+    actions = make_actions(seed)
+    evaluator = BanditEvaluator(sharder=MD5Sharder())
+
+    # the same subject with subsets of the actions
+    rng = random.Random(seed)
+    for size in [1, 5, 40]:
+        subset = {key: actions[key] for key in rng.sample(list(actions), size)}
+        assert evaluator.evaluate_bandit(
+            "flag",
+            "alice",
+            subject_attributes,
+            ActionCatalog(subset),
+            compiled_model,
+            subject_terms,
+        ) == evaluator.evaluate_bandit(
+            "flag", "alice", subject_attributes, subset, model
+        )
+
+    with pytest.raises(ValueError):
+        BulkBanditEvaluator().evaluate_bandit(
+            "flag",
+            ["alice", "bob"],
+            [subject_attributes, subject_attributes],
+            actions,
+            compiled_model,
+            subject_terms,
+        )
+
+
+def test_client_caches_subject_terms():
+    bandit = compile_bandit(
+        BanditData(
+            bandit_key="bandit",
+            modelName="falcon",
+            modelVersion="v1",
+            modelData=make_model(0),
+            updated_at="2024-01-01T00:00:00Z",
+        )
+    )
+    config_requestor = MagicMock()
+    config_requestor.get_bandit_model.return_value = bandit
+    client = EppoClient(
+        config_requestor=config_requestor,
+        assignment_logger=MagicMock(),
+        poll_interval_seconds=None,
+        bandit_score_cache={},
+    )
+    actions = make_actions(0)
+    catalog = ActionCatalog(actions)
+
+    with patch.object(
+        CompiledBanditModel,
+        "score_subject_terms",
+        autospec=True,
+        side_effect=CompiledBanditModel.score_subject_terms,
+    ) as score_subject_terms:
+        for subject_key in ["alice", "bob"]:
+            for action_keys in [["action-1", "action-2"], list(actions)]:
+                assert (
+                    client.evaluate_bandit_action(
+                        "flag",
+                        "bandit",
+                        subject_key,
+                        {"age": 30, "country": "UK"},
+                        ActionCatalog(
+                            {key: actions[key] for key in action_keys if key in actions}
+                        ),
+                    )
+                    == BanditEvaluator(sharder=MD5Sharder())
+                    .evaluate_bandit(
+                        "flag",
+                        subject_key,
+                        ContextAttributes.from_dict({"age": 30, "country": "UK"}),
+                        {key: actions[key] for key in action_keys if key in actions},
+                        bandit.bandit.bandit_model_data,
+                    )
+                    .action_key
+                )
+        # subjects with the same attributes share the subject terms
+        assert score_subject_terms.call_count == 1
+
+        client.evaluate_bandit_action(
+            "flag", "bandit", "alice", {"age": 31, "country": "UK"}, catalog
+        )
+        assert score_subject_terms.call_count == 2
+
+        # actions outside a catalog are scored one by one
+        client.evaluate_bandit_action(
+            "flag", "bandit", "alice", {"age": 32, "country": "UK"}, actions
+        )
+        assert score_subject_terms.call_count == 2
+
+        # a new configuration has a new compiled model
+        config_requestor.get_bandit_model.return_value = compile_bandit(bandit.bandit)
+        client.evaluate_bandit_action(
+            "flag", "bandit", "alice", {"age": 30, "country": "UK"}, catalog
+        )
+        assert score_subject_terms.call_count == 3
+
+
+def test_weigh_scores_matches_weigh_actions():
+    action_scores = {"b": 1.0, "a": 1.0, "c": 0.5, "d": -2.0}
+    expected = BanditEvaluator(sharder=MD5Sharder()).weigh_actions(
+        action_scores, 10.0, 0.2
+    )
+    weights = weigh_scores(
+        list(action_scores), np.array([list(action_scores.values())]), 10.0, 0.2
+    )
+    assert dict(zip(action_scores, weights[0].tolist())) == expected
+
+
+@pytest.mark.parametrize("number_of_subjects", [1, 200])
+def test_weigh_scores_adds_weights_like_sum(number_of_subjects):
+    # From Python 3.12, sum() of floats is compensated, and rounds differently
+    # from adding them one after the other. A single subject has its weights
+    # added with sum(), and many subjects by columns.
+    evaluator = BanditEvaluator(sharder=MD5Sharder())
+    rng = random.Random(0)
+    action_keys = [f"action-{i}" for i in range(20)]
+    scores = np.array(
+        [[rng.uniform(-1, 1) for _ in action_keys] for _ in range(number_of_subjects)]
+    )
+    gamma = rng.uniform(0, 100)
+
+    weights = weigh_scores(action_keys, scores, gamma, 0.0)
+
+    for row_scores, row_weights in zip(scores.tolist(), weights.tolist()):
+        expected = evaluator.weigh_actions(
+            dict(zip(action_keys, row_scores)), gamma, 0.0
+        )
+        assert dict(zip(action_keys, row_weights)) == expected
+
+
+@pytest.mark.parametrize("shape", [(3, 40), (300, 40)])
+def test_sum_rows_matches_sum(shape):
+    rng = random.Random(0)
+    # magnitudes far apart, where compensation changes the result
+    values = np.array(
+        [
+            [
+                rng.choice([1e16, 1.0, 0.1, 1e-16]) * rng.random()
+                for _ in range(shape[1])
+            ]
+            for _ in range(shape[0])
+        ]
+    )
+    assert sum_rows(values).tolist() == [sum(row) for row in values.tolist()]
+
+
+def test_few_actions_are_scored_one_by_one(monkeypatch):
+    monkeypatch.setattr(bandit_module, "MIN_CATALOG_ACTIONS_FOR_COMPILED_SCORING", 5)
+    compiled_model = compile_bandit_model(make_model(0))
+    actions = make_actions(0)
+    evaluator = BanditEvaluator(sharder=MD5Sharder())
+
+    with patch.object(
+        CompiledBanditModel,
+        "score_subjects",
+        autospec=True,
+        side_effect=CompiledBanditModel.score_subjects,
+    ) as score_subjects:
+        for scored_actions, compiled_calls in [
+            # actions outside a catalog, however many
+            (actions, 0),
+            (ActionCatalog({key: actions[key] for key in list(actions)[:4]}), 0),
+            (ActionCatalog({key: actions[key] for key in list(actions)[:5]}), 1),
+        ]:
+            evaluator.evaluate_bandit(
+                "flag",
+                "alice",
+                ContextAttributes.empty(),
+                scored_actions,
+                compiled_model,
+            )
+            assert score_subjects.call_count == compiled_calls
+
+
+def test_compiled_model_with_empty_actions():
+    model = make_model(0)
+    evaluation = BanditEvaluator(sharder=DeterministicSharder({})).evaluate_bandit(
+        "flag",
+        "subject",
+        ContextAttributes.empty(),
+        ActionCatalog({}),
+        compile_bandit_model(model),
+    )
+    assert evaluation.action_key is None
+    assert evaluation.gamma == model.gamma
+
+
+def test_numeric_attributes_must_be_numbers():
+    model = BanditModelData(
+        gamma=1.0,
+        default_action_score=0.0,
+        action_probability_floor=0.0,
+        coefficients={
+            "action": BanditCoefficients(
+                action_key="action",
+                intercept=0.0,
+                subject_numeric_coefficients=[numeric("age", 1.0, 0.0)],
+                subject_categorical_coefficients=[],
+                action_numeric_coefficients=[],
+                action_categorical_coefficients=[],
+            )
+        },
+    )
+    with pytest.raises(TypeError):
+        BanditEvaluator(sharder=MD5Sharder()).evaluate_bandit(
+            "flag",
+            "subject",
+            ContextAttributes(numeric_attributes={"age": "30"}, categorical_attributes={}),  # type: ignore
+            ActionCatalog({"action": ContextAttributes.empty()}),
+            compile_bandit_model(model),
+        )
+
+
+def test_stored_bandits_are_compiled():
+    bandit = compile_bandit(
+        BanditData(
+            bandit_key="bandit",
+            modelName="falcon",
+            modelVersion="v1",
+            modelData=make_model(0),
+            updated_at="2024-01-01T00:00:00Z",
+        )
+    )
+    assert bandit.bandit_key == "bandit"
+    assert bandit.bandit_model_version == "v1"
+    assert isinstance(bandit.model, CompiledBanditModel)
@@ -0,0 +1,256 @@
+import datetime
+
+import pytest
+
+from eppo_client.bandit import BanditEvaluator, ContextAttributes
+from eppo_client.eval import Evaluator, compile_flag
+from eppo_client.models import (
+    Allocation,
+    BanditCategoricalAttributeCoefficient,
+    BanditCoefficients,
+    BanditModelData,
+    BanditNumericAttributeCoefficient,
+    Flag,
+    Range,
+    Shard,
+    Split,
+    Variation,
+    VariationType,
+)
+from eppo_client.rules import Condition, OperatorType, Rule
+from eppo_client.sharders import DeterministicSharder, MD5Sharder
+
+pytest.importorskip("numpy")
+
+from eppo_client.bulk import (  # noqa: E402
+    NOT_ASSIGNED,
+    BulkBanditEvaluator,
+    BulkEvaluator,
+    get_shards,
+)
+
+VARIATION_A = Variation(key="a", value="A")
+VARIATION_B = Variation(key="b", value="B")
+VARIATION_C = Variation(key="c", value="C")
+
+SUBJECT_KEYS = [f"subject-{i}" for i in range(500)]
+SUBJECT_ATTRIBUTES = [
+    {"country": ["US", "UK", "FR"][i % 3], "age": i % 60} for i in range(500)
+]
+
+
+def make_flag(enabled=True):
+    return Flag(
+        key="flag",
+        enabled=enabled,
+        variation_type=VariationType.STRING,
+        variations={"a": VARIATION_A, "b": VARIATION_B, "c": VARIATION_C},
+        allocations=[
+            Allocation(
+                key="expired",
+                end_at=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+                splits=[Split(variation_key="c", shards=[])],
+            ),
+            Allocation(
+                key="uk-adults",
+                rules=[
+                    Rule(
+                        conditions=[
+                            Condition(
+                                operator=OperatorType.ONE_OF,
+                                attribute="country",
+                                value=["UK"],
+                            ),
+                            Condition(
+                                operator=OperatorType.GTE, attribute="age", value=18
+                            ),
+                        ]
+                    )
+                ],
+                splits=[Split(variation_key="c", shards=[])],
+            ),
+            Allocation(
+                key="experiment",
+                splits=[
+                    Split(
+                        variation_key="a",
+                        shards=[
+                            Shard(salt="traffic", ranges=[Range(start=0, end=5000)]),
+                            Shard(
+                                salt="split",
+                                ranges=[
+                                    Range(start=0, end=3000),
+                                    Range(start=7000, end=8000),
+                                ],
+                            ),
+                        ],
+                    ),
+                    Split(
+                        variation_key="b",
+                        shards=[
+                            Shard(salt="traffic", ranges=[Range(start=0, end=5000)]),
+                        ],
+                    ),
+                ],
+            ),
+        ],
+        total_shards=10_000,
+    )
+
+
+def test_get_shards_matches_md5_sharder():
+    sharder = MD5Sharder()
+    shards = get_shards(SUBJECT_KEYS + ["", "ünïcode"], "salt", 10_000, sharder)
+    assert shards.tolist() == [
+        sharder.get_shard(f"salt-{subject_key}", 10_000)
+        for subject_key in SUBJECT_KEYS + ["", "ünïcode"]
+    ]
+
+
+@pytest.mark.parametrize("subject_attributes", [None, SUBJECT_ATTRIBUTES])
+def test_bulk_evaluation_matches_evaluator(subject_attributes):
+    flag = make_flag()
+    result = BulkEvaluator().evaluate_flag(flag, SUBJECT_KEYS, subject_attributes)
+
+    evaluator = Evaluator(sharder=MD5Sharder())
+    expected = [
+        evaluator.evaluate_flag(
+            flag,
+            subject_key,
+            subject_attributes[i] if subject_attributes else {},
+        )
+        for i, subject_key in enumerate(SUBJECT_KEYS)
+    ]
+    assert [
+        result.allocation_keys[i] if i != NOT_ASSIGNED else None
+        for i in result.allocation_indices.tolist()
+    ] == [evaluation.allocation_key for evaluation in expected]
+    assert result.values() == [
+        evaluation.variation.value if evaluation.variation else None
+        for evaluation in expected
+    ]
+    # every branch of the flag is exercised
+    assert set(result.values("default")) == (
+        {"A", "B", "C", "default"} if subject_attributes else {"A", "B", "default"}
+    )
+
+
+def test_bulk_evaluation_with_custom_sharder():
+    flag = make_flag()
+    sharder = DeterministicSharder(
+        {"traffic-subject-1": 4999, "split-subject-1": 7000, "split-subject-2": 3000}
+    )
+    result = BulkEvaluator(sharder=sharder).evaluate_flag(
+        compile_flag(flag), ["subject-1", "subject-2", "subject-3"]
+    )
+    assert result.values() == ["A", "B", "A"]
+
+
+def test_bulk_evaluation_of_disabled_flag():
+    result = BulkEvaluator().evaluate_flag(make_flag(enabled=False), SUBJECT_KEYS)
+    assert (result.allocation_indices == NOT_ASSIGNED).all()
+    assert result.values("default") == ["default"] * len(SUBJECT_KEYS)
+
+
+def test_bulk_evaluation_checks_attributes_length():
+    with pytest.raises(ValueError):
+        BulkEvaluator().evaluate_flag(make_flag(), SUBJECT_KEYS, [{}])
+
+
+def make_bandit_model():
+    return BanditModelData(
+        gamma=5.0,
+        default_action_score=0.0,
+        action_probability_floor=0.1,
+        coefficients={
+            action_key: BanditCoefficients(
+                action_key=action_key,
+                intercept=intercept,
+                subject_numeric_coefficients=[
+                    BanditNumericAttributeCoefficient(
+                        attribute_key="age",
+                        coefficient=coefficient,
+                        missing_value_coefficient=0.1,
+                    )
+                ],
+                subject_categorical_coefficients=[
+                    BanditCategoricalAttributeCoefficient(
+                        attribute_key="country",
+                        missing_value_coefficient=0.0,
+                        value_coefficients={"US": 0.3, "UK": -0.2},
+                    )
+                ],
+                action_numeric_coefficients=[
+                    BanditNumericAttributeCoefficient(
+                        attribute_key="price",
+                        coefficient=-0.01,
+                        missing_value_coefficient=0.0,
+                    )
+                ],
+                action_categorical_coefficients=[],
+            )
+            for action_key, intercept, coefficient in [
+                ("nike", 0.5, 0.01),
+                ("adidas", 0.2, 0.02),
+                ("reebok", 0.4, -0.01),
+            ]
+        },
+    )
+
+
+def test_bulk_bandit_evaluation_matches_bandit_evaluator():
+    model = make_bandit_model()
+    subject_attributes = [
+        ContextAttributes.from_dict(attributes) for attributes in SUBJECT_ATTRIBUTES
+    ]
+    actions = {
+        "nike": ContextAttributes.from_dict({"price": 50}),
+        "adidas": ContextAttributes.from_dict({"price": 80}),
+        "reebok": ContextAttributes.empty(),
+        "puma": ContextAttributes.empty(),  # not in the model
+    }
+    result = BulkBanditEvaluator().evaluate_bandit(
+        "flag", SUBJECT_KEYS, subject_attributes, actions, model
+    )
+
+    evaluator = BanditEvaluator(sharder=MD5Sharder())
+    expected = [
+        evaluator.evaluate_bandit(
+            "flag", subject_key, subject_attributes[i], actions, model
+        )
+        for i, subject_key in enumerate(SUBJECT_KEYS)
+    ]
+    assert result.actions() == [evaluation.action_key for evaluation in expected]
+    assert result.action_scores.tolist() == [
+        evaluation.action_score for evaluation in expected
+    ]
+    assert result.action_weights.tolist() == [
+        evaluation.action_weight for evaluation in expected
+    ]
+    assert result.optimality_gaps.tolist() == [
+        evaluation.optimality_gap for evaluation in expected
+    ]
+    assert set(result.actions()) == set(actions)
+
+
+def test_bulk_bandit_evaluation_without_actions():
+    result = BulkBanditEvaluator().evaluate_bandit(
+        "flag",
+        ["subject-1", "subject-2"],
+        [ContextAttributes.empty()] * 2,
+        {},
+        make_bandit_model(),
+    )
+    assert result.actions() == [None, None]
+    assert result.gamma == 5.0
+
+
+def test_bulk_bandit_evaluation_checks_attributes_length():
+    with pytest.raises(ValueError):
+        BulkBanditEvaluator().evaluate_bandit(
+            "flag",
+            SUBJECT_KEYS,
+            [],
+            {"nike": ContextAttributes.empty()},
+            make_bandit_model(),
+        )
@@ -2,7 +2,7 @@ from unittest.mock import Mock
 
 from cachetools import LRUCache
 
-from eppo_client.assignment_logger import AssignmentCacheLogger
+from eppo_client.assignment_logger import AssignmentCacheLogger, AssignmentLogger
 from eppo_client.client import _utcnow
 from eppo_client.version import __version__
 
@@ -30,6 +30,96 @@ def test_assignment_cache():
     assert inner.log_assignment.call_count == 1
 
 
+def test_batch_assignment_cache():
+    inner = Mock()
+    logger = AssignmentCacheLogger(inner, assignment_cache=LRUCache(100))
+
+    logger.log_assignment(make_assignment_event(subject="subject-1"))
+    logger.log_assignments(
+        [
+            make_assignment_event(subject="subject-1"),
+            make_assignment_event(subject="subject-2"),
+            make_assignment_event(subject="subject-2"),
+        ]
+    )
+    assert inner.log_assignments.call_count == 1
+    assert [event["subject"] for event in inner.log_assignments.call_args.args[0]] == [
+        "subject-2"
+    ]
+
+    logger.log_assignments([make_assignment_event(subject="subject-2")])
+    assert inner.log_assignments.call_count == 1
+
+
+def test_failed_batch_is_not_cached():
+    inner = Mock()
+    inner.log_assignments.side_effect = [RuntimeError("unavailable"), None]
+    logger = AssignmentCacheLogger(inner, assignment_cache=LRUCache(100))
+    events = [
+        make_assignment_event(subject="subject-1"),
+        make_assignment_event(subject="subject-2"),
+    ]
+
+    try:
+        logger.log_assignments(events)
+    except RuntimeError:
+        pass
+    logger.log_assignments(events)
+
+    assert inner.log_assignments.call_count == 2
+    assert inner.log_assignments.call_args.args[0] == events
+
+    logger.log_assignments(events)
+    assert inner.log_assignments.call_count == 2
+
+
+def test_batch_with_single_event_logger():
+    class SingleEventLogger:
+        def __init__(self):
+            self.events = []
+
+        def log_assignment(self, event):
+            self.events.append(event)
+
+    inner = SingleEventLogger()
+    logger = AssignmentCacheLogger(inner, assignment_cache=LRUCache(100))  # type: ignore
+    logger.log_assignments([make_assignment_event(subject="subject-1")])
+    assert len(inner.events) == 1
+    # without _should_log_assignment, every assignment may be logged
+    assert logger._should_log_assignment("flag", "subject-2", "a", "v")
+
+
+def test_should_log_assignment():
+    class MyLogger(AssignmentLogger):
+        def log_assignment(self, assignment_event):
+            pass
+
+    assert not AssignmentLogger()._should_log_assignment("flag", "subject", "a", "v")
+    assert MyLogger()._should_log_assignment("flag", "subject", "a", "v")
+
+    # methods set on the instance count too
+    events = []
+    logger = AssignmentLogger()
+    logger.log_assignment = events.append  # type: ignore
+    assert logger._should_log_assignment("flag", "subject", "a", "v")
+    logger = AssignmentLogger()
+    logger.log_assignments = Mock()  # type: ignore
+    assert logger._should_log_assignment("flag", "subject", "a", "v")
+
+    logger = AssignmentCacheLogger(MyLogger(), assignment_cache=LRUCache(100))
+    assert logger._should_log_assignment("flag", "subject", "a", "v")
+    logger.log_assignment(
+        make_assignment_event(
+            featureFlag="flag", subject="subject", allocation="a", variation="v"
+        )
+    )
+    assert not logger._should_log_assignment("flag", "subject", "a", "v")
+    assert logger._should_log_assignment("flag", "subject", "a", "other")
+
+    logger = AssignmentCacheLogger(AssignmentLogger())
+    assert not logger._should_log_assignment("flag", "subject", "a", "v")
+
+
 def test_bandit_cache():
     inner = Mock()
     logger = AssignmentCacheLogger(inner, bandit_cache=LRUCache(100))
@@ -1,13 +1,22 @@
 import json
 import datetime
 import os
+from functools import partial
 from time import sleep
 from unittest.mock import patch
 import httpretty  # type: ignore
+from cachetools import LRUCache
 import pytest
-from eppo_client.assignment_logger import AssignmentLogger
-from eppo_client.client import EppoClient, check_type_match, check_value_type_match
+from eppo_client.assignment_logger import AssignmentCacheLogger, AssignmentLogger
+from eppo_client.client import (
+    EppoClient,
+    _assignment_event,
+    check_type_match,
+    check_value_type_match,
+)
 from eppo_client.config import Config
+from eppo_client.diagnostics import Diagnostics
+from eppo_client.eval import Evaluator, compile_flag
 from eppo_client.models import (
     Allocation,
     Flag,
@@ -183,6 +192,361 @@ def test_get_assignment_handles_logging_exception(mock_config_requestor, mock_lo
     )
 
 
+@patch("eppo_client.assignment_logger.AssignmentLogger")
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_batch_assignment_logs_events_once(mock_config_requestor, mock_logger):
+    flag = Flag(
+        key="flag-key",
+        enabled=True,
+        variation_type=VariationType.STRING,
+        variations={"control": Variation(key="control", value="control")},
+        allocations=[
+            Allocation(
+                key="allocation",
+                splits=[
+                    Split(
+                        variation_key="control",
+                        shards=[Shard(salt="salt", ranges=[Range(start=0, end=10000)])],
+                    )
+                ],
+            )
+        ],
+        total_shards=10_000,
+    )
+
+    mock_config_requestor.get_configuration.return_value = flag
+    client = EppoClient(
+        config_requestor=mock_config_requestor, assignment_logger=mock_logger
+    )
+    subjects = [("user-1", {}), ("user-2", {"country": "US"}), ("user-3", None)]
+    assert client.get_string_assignments("flag-key", subjects, "default value") == [
+        "control",
+        "control",
+        "control",
+    ]
+    assert mock_config_requestor.get_configuration.call_count == 1
+    assert mock_logger.log_assignments.call_count == 1
+    assert mock_logger.log_assignment.call_count == 0
+
+    events = mock_logger.log_assignments.call_args.args[0]
+    assert [event["subject"] for event in events] == ["user-1", "user-2", "user-3"]
+    assert events[1]["subjectAttributes"] == {"country": "US"}
+    assert events[2]["subjectAttributes"] == {}
+
+
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_batch_assignment_validates_subjects(mock_config_requestor):
+    client = EppoClient(
+        config_requestor=mock_config_requestor, assignment_logger=AssignmentLogger()
+    )
+    with pytest.raises(ValueError) as exc_info:
+        client.get_string_assignments(
+            "flag-key", [("user-1", {}), ("", {})], "default value"
+        )
+    assert exc_info.value.args[0] == "Invalid value for subject_key: cannot be blank"
+
+
+@patch("eppo_client.assignment_logger.AssignmentLogger")
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_get_all_assignments(mock_config_requestor, mock_logger):
+    def make_flag(key, variation_type, value, do_log=True):
+        return Flag(
+            key=key,
+            enabled=True,
+            variation_type=variation_type,
+            variations={"on": Variation(key="on", value=value)},
+            allocations=[
+                Allocation(
+                    key="allocation",
+                    splits=[Split(variation_key="on", shards=[])],
+                    do_log=do_log,
+                )
+            ],
+            total_shards=10_000,
+        )
+
+    mock_config_requestor.get_configurations.return_value = {
+        "string-flag": make_flag("string-flag", VariationType.STRING, "on"),
+        "json-flag": make_flag("json-flag", VariationType.JSON, '{"hello": "world"}'),
+        "silent-flag": make_flag("silent-flag", VariationType.INTEGER, 3, do_log=False),
+        "mistyped-flag": make_flag("mistyped-flag", VariationType.INTEGER, "three"),
+    }
+    client = EppoClient(
+        config_requestor=mock_config_requestor, assignment_logger=mock_logger
+    )
+
+    assert client.get_all_assignments("user-1", {"country": "US"}) == {
+        "string-flag": "on",
+        "json-flag": {"hello": "world"},
+        "silent-flag": 3,
+    }
+    events = mock_logger.log_assignments.call_args.args[0]
+    assert [event["featureFlag"] for event in events] == ["string-flag", "json-flag"]
+
+    assert client.get_all_assignments(
+        "user-1", flag_keys=["silent-flag", "missing-flag"]
+    ) == {"silent-flag": 3}
+    assert mock_config_requestor.get_configurations.call_count == 2
+    assert mock_logger.log_assignments.call_count == 1
+
+    details = client.get_all_assignment_details("user-1")
+    assert details["mistyped-flag"].variation is None
+
+    with pytest.raises(ValueError):
+        client.get_all_assignments("")
+
+
+@patch("eppo_client.assignment_logger.AssignmentLogger")
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_evaluation_cache(mock_config_requestor, mock_logger):
+    def make_flag(variation_value):
+        return compile_flag(
+            Flag(
+                key="flag-key",
+                enabled=True,
+                variation_type=VariationType.STRING,
+                variations={"on": Variation(key="on", value=variation_value)},
+                allocations=[
+                    Allocation(
+                        key="allocation",
+                        splits=[Split(variation_key="on", shards=[])],
+                    )
+                ],
+                total_shards=10_000,
+            )
+        )
+
+    mock_config_requestor.get_configuration.return_value = make_flag("control")
+    client = EppoClient(
+        config_requestor=mock_config_requestor,
+        assignment_logger=mock_logger,
+        evaluation_cache=LRUCache(100),
+    )
+
+    with patch.object(
+        Evaluator, "evaluate_flag", autospec=True, side_effect=Evaluator.evaluate_flag
+    ) as evaluate_flag:
+        for _ in range(3):
+            assert (
+                client.get_string_assignment("flag-key", "user-1", {"age": 1}, "")
+                == "control"
+            )
+        assert evaluate_flag.call_count == 1
+        # hits still log the assignment
+        assert mock_logger.log_assignment.call_count == 3
+
+        # attribute types are part of the key
+        client.get_string_assignment("flag-key", "user-1", {"age": True}, "")
+        client.get_string_assignment("flag-key", "user-2", {"age": 1}, "")
+        assert evaluate_flag.call_count == 3
+
+        # unhashable attributes are evaluated every time
+        client.get_string_assignment("flag-key", "user-1", {"tags": ["a"]}, "")
+        client.get_string_assignment("flag-key", "user-1", {"tags": ["a"]}, "")
+        assert evaluate_flag.call_count == 5
+
+        # a new configuration invalidates the cached evaluations
+        mock_config_requestor.get_configuration.return_value = make_flag("treatment")
+        assert (
+            client.get_string_assignment("flag-key", "user-1", {"age": 1}, "")
+            == "treatment"
+        )
+        assert evaluate_flag.call_count == 6
+
+
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_evaluation_cache_hits_log_their_own_subject(mock_config_requestor):
+    mock_config_requestor.get_configuration.return_value = compile_flag(
+        Flag(
+            key="flag-key",
+            enabled=True,
+            variation_type=VariationType.STRING,
+            variations={"on": Variation(key="on", value="control")},
+            allocations=[
+                Allocation(
+                    key="allocation",
+                    splits=[Split(variation_key="on", shards=[])],
+                )
+            ],
+            total_shards=10_000,
+        )
+    )
+
+    class RecordingLogger(AssignmentLogger):
+        def __init__(self):
+            self.subjects = []
+
+        def log_assignment(self, assignment_event):
+            self.subjects.append(
+                (
+                    assignment_event["subject"],
+                    dict(assignment_event["subjectAttributes"]),
+                )
+            )
+
+    logger = RecordingLogger()
+    client = EppoClient(
+        config_requestor=mock_config_requestor,
+        assignment_logger=logger,
+        evaluation_cache=LRUCache(100),
+    )
+
+    first_attributes = {"age": 1}
+    client.get_string_assignment("flag-key", "user-1", first_attributes, "")
+    # the first caller reuses its dict; later hits must not see the change
+    first_attributes["age"] = 2
+    first_attributes["email"] = "user-1@example.com"
+    client.get_string_assignment("flag-key", "user-1", {"age": 1}, "")
+
+    assert logger.subjects == [("user-1", {"age": 1}), ("user-1", {"age": 1})]
+
+
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_assignment_events_are_only_built_when_logged(mock_config_requestor):
+    flag = Flag(
+        key="flag-key",
+        enabled=True,
+        variation_type=VariationType.STRING,
+        variations={"control": Variation(key="control", value="control")},
+        allocations=[
+            Allocation(
+                key="allocation",
+                splits=[Split(variation_key="control", shards=[])],
+            )
+        ],
+        total_shards=10_000,
+    )
+    mock_config_requestor.get_configuration.return_value = flag
+
+    class MyLogger(AssignmentLogger):
+        def __init__(self):
+            self.events = []
+
+        def log_assignment(self, assignment_event):
+            self.events.append(assignment_event)
+
+    inner_logger = MyLogger()
+    for assignment_logger, built_events in [
+        (AssignmentLogger(), 0),
+        (inner_logger, 2),
+        (AssignmentCacheLogger(inner_logger, assignment_cache=LRUCache(100)), 1),
+    ]:
+        client = EppoClient(
+            config_requestor=mock_config_requestor,
+            assignment_logger=assignment_logger,
+        )
+        with patch(
+            "eppo_client.client._assignment_event", side_effect=_assignment_event
+        ) as assignment_event:
+            for _ in range(2):
+                assert (
+                    client.get_string_assignment("flag-key", "user-1", {}, "default")
+                    == "control"
+                )
+        assert assignment_event.call_count == built_events
+    assert len(inner_logger.events) == 3
+
+    # a base logger whose method is set on the instance logs too
+    instance_events: list = []
+    instance_logger = AssignmentLogger()
+    instance_logger.log_assignment = instance_events.append  # type: ignore
+    client = EppoClient(
+        config_requestor=mock_config_requestor, assignment_logger=instance_logger
+    )
+    client.get_string_assignment("flag-key", "user-1", {}, "default")
+    assert [event["subject"] for event in instance_events] == ["user-1"]
+
+
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_logger_without_assignment_logger_base(mock_config_requestor):
+    mock_config_requestor.get_configuration.return_value = compile_flag(
+        Flag(
+            key="flag-key",
+            enabled=True,
+            variation_type=VariationType.STRING,
+            variations={"control": Variation(key="control", value="control")},
+            allocations=[
+                Allocation(
+                    key="allocation",
+                    splits=[Split(variation_key="control", shards=[])],
+                )
+            ],
+            total_shards=10_000,
+        )
+    )
+
+    # only implements log_assignment
+    class DuckTypedLogger:
+        def __init__(self):
+            self.events = []
+
+        def log_assignment(self, assignment_event):
+            self.events.append(assignment_event)
+
+    inner_logger = DuckTypedLogger()
+    for assignment_logger in [inner_logger, AssignmentCacheLogger(inner_logger)]:  # type: ignore
+        client = EppoClient(
+            config_requestor=mock_config_requestor,
+            assignment_logger=assignment_logger,  # type: ignore
+        )
+        assert client.get_string_assignment("flag-key", "user-1", {}, "") == "control"
+        assert client.get_string_assignments(
+            "flag-key", [("user-2", {}), ("user-3", {})], ""
+        ) == ["control", "control"]
+    assert [event["subject"] for event in inner_logger.events] == [
+        "user-1",
+        "user-2",
+        "user-3",
+    ] * 2
+
+
+@pytest.mark.parametrize("json_assignment_views", [False, True])
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_json_assignments(mock_config_requestor, json_assignment_views):
+    mock_config_requestor.get_configuration.return_value = compile_flag(
+        Flag(
+            key="json-flag",
+            enabled=True,
+            variation_type=VariationType.JSON,
+            variations={
+                "layout": Variation(key="layout", value='{"widgets": ["a", "b"]}')
+            },
+            allocations=[
+                Allocation(
+                    key="allocation",
+                    splits=[Split(variation_key="layout", shards=[])],
+                )
+            ],
+            total_shards=10_000,
+        )
+    )
+    client = EppoClient(
+        config_requestor=mock_config_requestor,
+        assignment_logger=AssignmentLogger(),
+        json_assignment_views=json_assignment_views,
+    )
+
+    first = client.get_json_assignment("json-flag", "user-1", {}, {})
+    second = client.get_json_assignment("json-flag", "user-2", {}, {})
+    if json_assignment_views:
+        # a read-only view shared by all the assignments
+        assert first is second
+        assert first["widgets"] == ("a", "b")
+        with pytest.raises(TypeError):
+            first["widgets"] = []
+    else:
+        assert first == second == {"widgets": ["a", "b"]}
+        first["widgets"].append("c")
+        assert second == {"widgets": ["a", "b"]}
+    # the raw value is still available
+    assert (
+        client.get_assignment_variation(
+            "json-flag", "user-1", {}, None, VariationType.JSON
+        )
+        == '{"widgets": ["a", "b"]}'
+    )
+
+
 @patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
 def test_with_null_experiment_config(mock_config_requestor):
     mock_config_requestor.get_configuration.return_value = None
@@ -197,6 +561,74 @@ def test_with_null_experiment_config(mock_config_requestor):
         client.get_string_assignment("flag-key-1", "user-1", {}, "hello world")
         == "hello world"
     )
+    assert client.get_string_assignments(
+        "flag-key-1", [("user-1", {}), ("user-2", {})], "default value"
+    ) == ["default value", "default value"]
+
+
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_missing_flags_are_logged_once_per_interval(mock_config_requestor, caplog):
+    mock_config_requestor.get_configuration.return_value = None
+    client = EppoClient(
+        config_requestor=mock_config_requestor, assignment_logger=AssignmentLogger()
+    )
+    for _ in range(100):
+        client.get_string_assignment("flag-key-1", "user-1", {}, "default value")
+
+    assert caplog.messages == [
+        "[Eppo SDK] No assigned variation. Flag not found: flag-key-1"
+    ]
+    assert client.get_diagnostic_counts() == {
+        ("No assigned variation. Flag not found", "flag-key-1"): 100
+    }
+
+
+@patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
+def test_diagnostics_are_summarized_periodically(mock_config_requestor, caplog):
+    mock_config_requestor.get_configuration.return_value = None
+    now = [0.0]
+    with patch(
+        "eppo_client.client.Diagnostics", partial(Diagnostics, clock=lambda: now[0])
+    ), patch("eppo_client.client.Poller") as poller:
+        client = EppoClient(
+            config_requestor=mock_config_requestor,
+            assignment_logger=AssignmentLogger(),
+            poll_interval_seconds=30,
+            diagnostics_interval_seconds=60,
+        )
+    poll = poller.call_args.kwargs["callback"]
+
+    def report():
+        client.get_string_assignment("flag-key-1", "user-1", {}, "default value")
+
+    for _ in range(3):
+        report()
+    now[0] = 30
+    poll()
+    assert caplog.messages == [
+        "[Eppo SDK] No assigned variation. Flag not found: flag-key-1"
+    ]
+
+    # without further reports, the summary comes with the next poll
+    now[0] = 60
+    poll()
+    assert mock_config_requestor.fetch_and_store_configurations.call_count == 2
+    assert caplog.messages[1] == (
+        "[Eppo SDK] No assigned variation. Flag not found: 2 more times"
+        " in the last 60s (flag-key-1: 2)"
+    )
+
+    # or with the counts
+    for _ in range(2):
+        report()
+    now[0] = 120
+    assert client.get_diagnostic_counts() == {
+        ("No assigned variation. Flag not found", "flag-key-1"): 5
+    }
+    assert caplog.messages[3].startswith(
+        "[Eppo SDK] No assigned variation. Flag not found: 1 more times"
+    )
+    assert len(caplog.messages) == 4
 
 
 @patch("eppo_client.configuration_requestor.ExperimentConfigurationRequestor")
@@ -280,6 +712,41 @@ def test_assign_subject_in_sample(test_case):
         ), f"expected <{subject['assignment']}> for subject {subject['subjectKey']}, found <{assigned_variation}>"
 
 
+@pytest.mark.parametrize("test_case", test_data)
+def test_batch_assign_subjects_in_sample(test_case):
+    client = get_instance()
+
+    get_typed_assignments = {
+        "STRING": client.get_string_assignments,
+        "INTEGER": client.get_integer_assignments,
+        "NUMERIC": client.get_numeric_assignments,
+        "BOOLEAN": client.get_boolean_assignments,
+        "JSON": client.get_json_assignments,
+    }[test_case["variationType"]]
+
+    subjects = test_case.get("subjects", [])
+    assigned_variations = get_typed_assignments(
+        test_case["flag"],
+        [(subject["subjectKey"], subject["subjectAttributes"]) for subject in subjects],
+        test_case["defaultValue"],
+    )
+    assert assigned_variations == [subject["assignment"] for subject in subjects]
+
+
+@pytest.mark.parametrize("test_case", test_data)
+def test_get_all_assignments_in_sample(test_case):
+    client = get_instance()
+
+    for subject in test_case.get("subjects", []):
+        assignments = client.get_all_assignments(
+            subject["subjectKey"], subject["subjectAttributes"]
+        )
+        assert (
+            assignments.get(test_case["flag"], test_case["defaultValue"])
+            == subject["assignment"]
+        )
+
+
 def get_assignments(test_case, get_assignment_fn):
     client = get_instance()
     client.__is_graceful_mode = False
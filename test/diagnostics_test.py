@@ -0,0 +1,116 @@
+import logging
+
+from eppo_client import diagnostics as diagnostics_module
+from eppo_client.diagnostics import OTHER_KEY, Diagnostics
+
+logger = logging.getLogger(__name__)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_diagnostics_are_rate_limited_and_summarized(caplog):
+    caplog.set_level(logging.INFO)
+    clock = FakeClock()
+    diagnostics = Diagnostics(logger, interval_seconds=60, clock=clock)
+
+    for _ in range(1000):
+        diagnostics.report(logging.WARNING, "Flag not found", "flag-a")
+    diagnostics.report(logging.WARNING, "Flag not found", "flag-b")
+    diagnostics.report(logging.WARNING, "Flag not found", "flag-b")
+    diagnostics.report(logging.ERROR, "Error getting assignment", "flag-a", "boom")
+    assert caplog.messages == [
+        "[Eppo SDK] Flag not found: flag-a",
+        "[Eppo SDK] Flag not found: flag-b",
+        "[Eppo SDK] Error getting assignment: boom",
+    ]
+
+    caplog.clear()
+    clock.now = 61
+    diagnostics.report(logging.WARNING, "Flag not found", "flag-a")
+    assert caplog.messages == [
+        "[Eppo SDK] Flag not found: 1000 more times in the last 61s"
+        " (flag-a: 999, flag-b: 1)",
+        # a new interval starts
+        "[Eppo SDK] Flag not found: flag-a",
+    ]
+    assert caplog.records[0].levelno == logging.WARNING
+
+    assert diagnostics.counts() == {
+        ("Flag not found", "flag-a"): 1001,
+        ("Flag not found", "flag-b"): 2,
+        ("Error getting assignment", "flag-a"): 1,
+    }
+
+
+def test_diagnostics_flush(caplog):
+    clock = FakeClock()
+    diagnostics = Diagnostics(logger, interval_seconds=60, clock=clock)
+    for i in range(10):
+        for _ in range(i + 2):
+            diagnostics.report(logging.WARNING, "Flag not found", f"flag-{i}")
+
+    caplog.clear()
+    clock.now = 5
+    diagnostics.flush()
+    assert caplog.messages == [
+        "[Eppo SDK] Flag not found: 55 more times in the last 5s (flag-9: 10,"
+        " flag-8: 9, flag-7: 8, flag-6: 7, flag-5: 6 and 5 more)"
+    ]
+
+    caplog.clear()
+    diagnostics.flush()
+    assert caplog.messages == []
+
+
+def test_diagnostics_without_interval_log_everything(caplog):
+    diagnostics = Diagnostics(logger, interval_seconds=None)
+    for _ in range(3):
+        diagnostics.report(logging.WARNING, "Flag not found", "flag-a")
+    assert caplog.messages == ["[Eppo SDK] Flag not found: flag-a"] * 3
+    assert diagnostics.counts() == {("Flag not found", "flag-a"): 3}
+
+
+def test_diagnostics_flush_if_due(caplog):
+    clock = FakeClock()
+    diagnostics = Diagnostics(logger, interval_seconds=60, clock=clock)
+    for _ in range(3):
+        diagnostics.report(logging.WARNING, "Flag not found", "flag-a")
+
+    caplog.clear()
+    clock.now = 30
+    diagnostics.flush_if_due()
+    assert caplog.messages == []
+
+    clock.now = 60
+    diagnostics.flush_if_due()
+    assert caplog.messages == [
+        "[Eppo SDK] Flag not found: 2 more times in the last 60s (flag-a: 2)"
+    ]
+
+
+def test_diagnostics_count_at_most_max_keys(caplog, monkeypatch):
+    monkeypatch.setattr(diagnostics_module, "MAX_KEYS", 3)
+    diagnostics = Diagnostics(logger, interval_seconds=60, clock=FakeClock())
+    for i in range(10):
+        diagnostics.report(logging.WARNING, "Flag not found", f"flag-{i}")
+    diagnostics.report(logging.WARNING, "Flag not found", "flag-0")
+
+    assert diagnostics.counts() == {
+        ("Flag not found", "flag-0"): 2,
+        ("Flag not found", "flag-1"): 1,
+        ("Flag not found", "flag-2"): 1,
+        ("Flag not found", OTHER_KEY): 7,
+    }
+    # the first key beyond the limit is logged, then they are rate-limited
+    assert caplog.messages == [
+        "[Eppo SDK] Flag not found: flag-0",
+        "[Eppo SDK] Flag not found: flag-1",
+        "[Eppo SDK] Flag not found: flag-2",
+        "[Eppo SDK] Flag not found: flag-3",
+    ]
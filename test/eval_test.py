@@ -1,4 +1,9 @@
+import copy
+import dataclasses
 import datetime
+import pickle
+
+import pytest
 
 from eppo_client.models import (
     Flag,
@@ -10,14 +15,20 @@ from eppo_client.models import (
     Shard,
 )
 from eppo_client.eval import (
+    AllocationSchedule,
     Evaluator,
     FlagEvaluation,
+    compile_flag,
+    compile_shard,
     is_in_shard_range,
     hash_key,
     matches_rules,
+    none_result,
+    NO_EXTRA_LOGGING,
 )
+from eppo_client.json_values import parse_json_value
 from eppo_client.rules import Condition, OperatorType, Rule
-from eppo_client.sharders import DeterministicSharder, MD5Sharder
+from eppo_client.sharders import DeterministicSharder, MD5Sharder, Sharder
 
 VARIATION_A = Variation(key="a", value="A")
 VARIATION_B = Variation(key="b", value="B")
@@ -46,6 +57,60 @@ def test_disabled_flag_returns_none_result():
     assert not result.do_log
 
 
+def test_none_results_share_extra_logging():
+    first = none_result("flag", VariationType.STRING, "subject-1", {})
+    second = none_result("flag", VariationType.STRING, "subject-2", {"age": 1})
+    assert first.extra_logging is second.extra_logging
+    with pytest.raises(TypeError):
+        first.extra_logging["key"] = "value"  # type: ignore
+    with pytest.raises(AttributeError):
+        first.variation = VARIATION_A  # type: ignore
+
+
+def test_flag_evaluation_is_not_a_tuple():
+    result = none_result("flag", VariationType.STRING, "subject", {})
+    assert not isinstance(result, tuple)
+    assert not hasattr(result, "__dict__")
+    assert result.json_value is None
+    assert "json_value" not in dataclasses.asdict(result)
+    assert dataclasses.asdict(result)["flag_key"] == "flag"
+    assert dataclasses.replace(result, do_log=True) == FlagEvaluation(
+        "flag",
+        VariationType.STRING,
+        "subject",
+        {},
+        None,
+        None,
+        NO_EXTRA_LOGGING,
+        True,
+    )
+
+
+def test_flag_evaluation_can_be_copied_and_pickled():
+    result = FlagEvaluation(
+        "flag",
+        VariationType.JSON,
+        "subject",
+        {"country": "UK"},
+        "allocation",
+        Variation(key="json", value='{"hello": ["world"]}'),
+        {"holdout": "status"},
+        True,
+        json_value=parse_json_value('{"hello": ["world"]}'),
+    )
+
+    for copied in [
+        copy.copy(result),
+        copy.deepcopy(result),
+        pickle.loads(pickle.dumps(result)),
+    ]:
+        assert copied == result
+        assert copied.json_value.copy() == {"hello": ["world"]}
+        assert copied.json_value.view["hello"] == ("world",)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            copied.do_log = False
+
+
 def test_matches_shard_full_range():
     shard = Shard(
         salt="a",
@@ -79,6 +144,22 @@ def test_matches_shard_no_match():
     assert evaluator.matches_shard(shard, "subject_key", 100) is False
 
 
+def test_compiled_shard_fragmented_ranges():
+    ranges = [Range(start=start, end=start + 3) for start in range(0, 100, 10)]
+    compiled_shard = compile_shard(Shard(salt="a", ranges=ranges), 100)
+
+    for shard_value in range(-1, 101):
+        assert compiled_shard.contains(shard_value) == any(
+            is_in_shard_range(shard_value, r) for r in ranges
+        )
+
+    # shards with the same ranges share their bitmap
+    assert (
+        compile_shard(Shard(salt="b", ranges=ranges), 100).bitmap
+        is compiled_shard.bitmap
+    )
+
+
 def test_eval_empty_flag():
     empty_flag = Flag(
         key="empty",
@@ -131,6 +212,57 @@ def test_simple_flag():
     assert result.variation == Variation(key="control", value="control")
 
 
+def test_full_rollout_does_not_hash():
+    class FailingSharder(Sharder):
+        def get_shard(self, input: str, total_shards: int) -> int:
+            raise AssertionError("subject should not be hashed")
+
+    flag = Flag(
+        key="flag-key",
+        enabled=True,
+        variation_type=VariationType.STRING,
+        variations={"a": VARIATION_A, "b": VARIATION_B},
+        allocations=[
+            Allocation(
+                key="never",
+                splits=[
+                    Split(
+                        variation_key="b",
+                        shards=[Shard(salt="salt", ranges=[])],
+                    )
+                ],
+            ),
+            Allocation(
+                key="rollout",
+                splits=[
+                    Split(
+                        variation_key="a",
+                        shards=[
+                            Shard(
+                                salt="salt",
+                                ranges=[
+                                    Range(start=0, end=5000),
+                                    Range(start=5000, end=10000),
+                                ],
+                            )
+                        ],
+                    )
+                ],
+            ),
+        ],
+        total_shards=10_000,
+    )
+
+    compiled_flag = compile_flag(flag)
+    assert compiled_flag.allocations[0].splits == ()
+    assert compiled_flag.allocations[1].splits[0].shards == ()
+
+    evaluator = Evaluator(sharder=FailingSharder())
+    result = evaluator.evaluate_flag(compiled_flag, "user-1", {})
+    assert result.allocation_key == "rollout"
+    assert result.variation == VARIATION_A
+
+
 def test_flag_target_on_id():
     flag = Flag(
         key="flag-key",
@@ -354,6 +486,254 @@ def test_eval_sharding():
     assert result.variation == VARIATION_C
 
 
+def test_eval_compiled_flag():
+    flag = Flag(
+        key="flag",
+        enabled=True,
+        variation_type=VariationType.STRING,
+        variations={"a": VARIATION_A, "b": VARIATION_B},
+        allocations=[
+            Allocation(
+                key="first",
+                rules=[
+                    Rule(
+                        conditions=[
+                            Condition(
+                                operator=OperatorType.ONE_OF,
+                                attribute="country",
+                                value=["UK", "US"],
+                            )
+                        ]
+                    )
+                ],
+                splits=[Split(variation_key="b", shards=[])],
+            ),
+            Allocation(
+                key="default",
+                rules=[],
+                splits=[
+                    Split(
+                        variation_key="a",
+                        shards=[Shard(salt="salt", ranges=[Range(start=0, end=10)])],
+                    )
+                ],
+            ),
+        ],
+        total_shards=10,
+    )
+
+    compiled_flag = compile_flag(flag)
+    assert compiled_flag.to_flag() == flag
+    assert compiled_flag.allocations[0].splits[0].variation == VARIATION_B
+    # runtime structures are slotted
+    for runtime_object in [
+        compiled_flag,
+        compiled_flag.allocation_index,
+        compiled_flag.schedule,
+        compiled_flag.allocations[0],
+        compiled_flag.allocations[0].rules[0],
+        compiled_flag.allocations[0].rules[0].conditions[0],
+        compiled_flag.allocations[0].splits[0],
+        compile_shard(Shard(salt="salt", ranges=[Range(start=0, end=5)]), 10),
+    ]:
+        assert not hasattr(runtime_object, "__dict__")
+
+    evaluator = Evaluator(sharder=MD5Sharder())
+    for subject_attributes in [{"country": "UK"}, {"country": "FR"}, {}]:
+        assert evaluator.evaluate_flag(
+            compiled_flag, "subject_key", subject_attributes
+        ) == evaluator.evaluate_flag(flag, "subject_key", subject_attributes)
+
+    result = evaluator.evaluate_flag(compiled_flag, "subject_key", {"country": "US"})
+    assert result.allocation_key == "first"
+    assert result.variation == VARIATION_B
+
+
+def test_compiled_flag_keeps_the_source_flag_exactly():
+    flag = Flag(
+        key="flag",
+        enabled=True,
+        variation_type=VariationType.NUMERIC,
+        variations={"one": Variation(key="one", value=1.0)},
+        allocations=[
+            Allocation(
+                key="allocation",
+                rules=[
+                    Rule(
+                        conditions=[
+                            Condition(
+                                operator=OperatorType.IS_NULL,
+                                attribute="email",
+                                value=False,
+                            ),
+                            Condition(
+                                operator=OperatorType.ONE_OF,
+                                attribute="beta",
+                                value=[True, 1, "1"],
+                            ),
+                        ]
+                    )
+                ],
+                start_at=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+                splits=[Split(variation_key="one", shards=[])],
+            )
+        ],
+    )
+
+    exported = compile_flag(flag).to_flag()
+
+    assert exported == flag
+    # True == 1 == 1.0, so the types are compared too
+    assert repr(exported.variations["one"].value) == "1.0"
+    conditions = exported.allocations[0].rules[0].conditions
+    assert repr([condition.value for condition in conditions]) == (
+        "[False, [True, 1, '1']]"
+    )
+
+
+def test_evaluate_flags():
+    us_flag = Flag(
+        key="us-flag",
+        enabled=True,
+        variation_type=VariationType.STRING,
+        variations={"a": VARIATION_A, "b": VARIATION_B},
+        allocations=[
+            Allocation(
+                key="us",
+                rules=[
+                    Rule(
+                        conditions=[
+                            Condition(
+                                operator=OperatorType.ONE_OF,
+                                attribute="country",
+                                value=["US"],
+                            )
+                        ]
+                    )
+                ],
+                splits=[Split(variation_key="b", shards=[])],
+            ),
+        ],
+        total_shards=10,
+    )
+    disabled_flag = Flag(
+        key="disabled-flag",
+        enabled=False,
+        variation_type=VariationType.STRING,
+        variations={"a": VARIATION_A},
+        allocations=[],
+        total_shards=10,
+    )
+    flags = [compile_flag(us_flag), compile_flag(disabled_flag), us_flag]
+
+    evaluator = Evaluator(sharder=MD5Sharder())
+    for subject_attributes in [{"country": "US"}, {"country": "FR"}, {}]:
+        assert evaluator.evaluate_flags(flags, "subject_key", subject_attributes) == [
+            evaluator.evaluate_flag(flag, "subject_key", subject_attributes)
+            for flag in flags
+        ]
+
+    results = evaluator.evaluate_flags(flags, "subject_key", {"country": "US"})
+    assert [result.variation for result in results] == [VARIATION_B, None, VARIATION_B]
+
+
+def test_eval_json_flag(caplog):
+    flag = Flag(
+        key="json-flag",
+        enabled=True,
+        variation_type=VariationType.JSON,
+        variations={
+            "valid": Variation(key="valid", value='{"hello": "world"}'),
+            "invalid": Variation(key="invalid", value="{hello"),
+        },
+        allocations=[
+            Allocation(
+                key="invalid",
+                rules=[
+                    Rule(
+                        conditions=[
+                            Condition(
+                                operator=OperatorType.ONE_OF,
+                                attribute="id",
+                                value=["subject-1"],
+                            )
+                        ]
+                    )
+                ],
+                splits=[Split(variation_key="invalid", shards=[])],
+            ),
+            Allocation(key="default", splits=[Split(variation_key="valid", shards=[])]),
+        ],
+        total_shards=10,
+    )
+
+    compiled_flag = compile_flag(flag)
+    assert "Invalid JSON value for variation invalid of flag json-flag" in caplog.text
+
+    evaluator = Evaluator(sharder=MD5Sharder())
+    result = evaluator.evaluate_flag(compiled_flag, "subject-2", {})
+    assert result.variation == flag.variations["valid"]
+    assert result.json_value.copy() == {"hello": "world"}
+
+    # subjects of invalid variations are not assigned
+    result = evaluator.evaluate_flag(compiled_flag, "subject-1", {})
+    assert result.allocation_key is None
+    assert result.variation is None
+    assert result.json_value is None
+    assert not result.do_log
+
+
+def test_eval_variation_of_wrong_type(caplog):
+    flag = Flag(
+        key="integer-flag",
+        enabled=True,
+        variation_type=VariationType.INTEGER,
+        variations={
+            "one": Variation(key="one", value=1),
+            "pi": Variation(key="pi", value=3.1416),
+        },
+        allocations=[
+            Allocation(
+                key="pi",
+                rules=[
+                    Rule(
+                        conditions=[
+                            Condition(
+                                operator=OperatorType.ONE_OF,
+                                attribute="id",
+                                value=["subject-1"],
+                            )
+                        ]
+                    )
+                ],
+                splits=[Split(variation_key="pi", shards=[])],
+            ),
+            Allocation(key="default", splits=[Split(variation_key="one", shards=[])]),
+        ],
+        total_shards=10,
+    )
+
+    compiled_flag = compile_flag(flag)
+    assert (
+        "Variation value does not have the correct type for the flag: "
+        "integer-flag and variation key pi" in caplog.text
+    )
+
+    evaluator = Evaluator(sharder=MD5Sharder())
+    result = evaluator.evaluate_flag(compiled_flag, "subject-2", {})
+    assert result.allocation_key == "default"
+    assert result.variation == flag.variations["one"]
+
+    # the first matching split decides, later allocations are not considered
+    caplog.clear()
+    result = evaluator.evaluate_flag(compiled_flag, "subject-1", {})
+    assert result.allocation_key is None
+    assert result.variation is None
+    assert not result.do_log
+    # reported once, when the configuration was loaded
+    assert caplog.text == ""
+
+
 def test_eval_prior_to_alloc(mocker):
     flag = Flag(
         key="flag",
@@ -432,6 +812,41 @@ def test_eval_after_alloc(mocker):
     assert result.variation is None
 
 
+def test_allocation_schedule_refreshes_at_boundaries(mocker):
+    schedule = AllocationSchedule(
+        [
+            (None, None),
+            (datetime.datetime(2024, 1, 1), datetime.datetime(2024, 2, 1)),
+            (datetime.datetime(2024, 1, 15), None),
+        ]
+    )
+    utcnow = mocker.patch(
+        "eppo_client.eval.utcnow", return_value=datetime.datetime(2023, 12, 31, 23)
+    )
+    monotonic = mocker.patch("eppo_client.eval.time.monotonic", return_value=0.0)
+    assert schedule.active() == (True, False, False)
+    assert utcnow.call_count == 1
+
+    # the dates are not compared again until the next boundary is due
+    monotonic.return_value = 3599.0
+    assert schedule.active() == (True, False, False)
+    assert utcnow.call_count == 1
+
+    utcnow.return_value = datetime.datetime(2024, 1, 1)
+    monotonic.return_value = 3600.0
+    assert schedule.active() == (True, True, False)
+    assert utcnow.call_count == 2
+
+    utcnow.return_value = datetime.datetime(2024, 2, 2)
+    monotonic.return_value = 3600.0 + 32 * 24 * 3600
+    assert schedule.active() == (True, False, True)
+
+    # no boundary left
+    monotonic.return_value = float("1e12")
+    assert schedule.active() == (True, False, True)
+    assert utcnow.call_count == 3
+
+
 def test_matches_rules_empty():
     rules = []
     subject_attributes = {"size": 10}
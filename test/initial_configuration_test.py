@@ -1,7 +1,15 @@
+import json
+from unittest.mock import Mock
+
 import eppo_client
 from eppo_client.config import Config
 from eppo_client.configuration import Configuration
+from eppo_client.configuration_requestor import ExperimentConfigurationRequestor
+from eppo_client.configuration_store import ConfigurationStore
 from eppo_client.assignment_logger import AssignmentLogger
+from eppo_client.client import EppoClient
+from eppo_client.eval import CompiledFlag, compile_flag
+from eppo_client.models import Flag
 
 
 def test_without_initial_configuration():
@@ -39,3 +47,143 @@ def test_update_configuration():
     client.set_configuration(Configuration(flags_configuration='{"flags":{}}'))
 
     assert client.is_initialized()
+
+
+def test_bandit_variations_are_indexed():
+    client = eppo_client.init(
+        Config(
+            api_key="test",
+            poll_interval_seconds=None,
+            assignment_logger=AssignmentLogger(),
+            initial_configuration=Configuration(
+                flags_configuration=json.dumps(
+                    {
+                        "flags": {
+                            flag_key: {
+                                "key": flag_key,
+                                "enabled": True,
+                                "variationType": "STRING",
+                                "variations": {
+                                    "banner": {
+                                        "key": "banner",
+                                        "value": "banner_bandit",
+                                    }
+                                },
+                                "allocations": [
+                                    {
+                                        "key": "everyone",
+                                        "splits": [
+                                            {"variationKey": "banner", "shards": []}
+                                        ],
+                                    }
+                                ],
+                                "totalShards": 10000,
+                            }
+                            for flag_key in ["bandit-flag", "other-flag"]
+                        },
+                        "bandits": {
+                            "banner_bandit": [
+                                {
+                                    "key": "banner_bandit",
+                                    "flagKey": "bandit-flag",
+                                    "variationKey": "banner",
+                                    "variationValue": "banner_bandit",
+                                }
+                            ]
+                        },
+                    }
+                )
+            ),
+        )
+    )
+
+    for flag_key in ["bandit-flag", "other-flag"]:
+        result = client.get_bandit_action(
+            flag_key, "alice", {}, {"nike": {}}, "default"
+        )
+        assert result.variation == "banner_bandit"
+        # no bandit model was loaded
+        assert result.action is None
+
+    # only the variation listed in the bandits section looks up its bandit
+    assert client.get_diagnostic_counts() == {
+        ("No assigned action. Bandit not found for flag", "bandit-flag"): 1
+    }
+
+
+def test_bandit_keys_are_replaced_with_their_flags():
+    flag_store: ConfigurationStore[CompiledFlag] = ConfigurationStore()
+    requestor = ExperimentConfigurationRequestor(
+        http_client=Mock(),
+        flag_config_store=flag_store,
+        bandit_config_store=ConfigurationStore(),
+    )
+    flags = {
+        "bandit-flag": {
+            "key": "bandit-flag",
+            "enabled": True,
+            "variationType": "STRING",
+            "variations": {"banner": {"key": "banner", "value": "banner_bandit"}},
+            "allocations": [],
+            "totalShards": 10000,
+        }
+    }
+    requestor.store_flags(
+        {
+            "flags": flags,
+            "bandits": {
+                "banner_bandit": [
+                    {
+                        "key": "banner_bandit",
+                        "flagKey": "bandit-flag",
+                        "variationKey": "banner",
+                        "variationValue": "banner_bandit",
+                    }
+                ]
+            },
+        }
+    )
+    compiled_flag = flag_store.get_configuration("bandit-flag")
+    assert compiled_flag is not None
+    # stored in the same swap as the flag
+    assert compiled_flag.bandit_keys == {"banner_bandit": "banner_bandit"}
+
+    requestor.store_flags({"flags": flags})
+    compiled_flag = flag_store.get_configuration("bandit-flag")
+    assert compiled_flag is not None
+    assert compiled_flag.bandit_keys == {}
+
+
+def test_bandit_key_is_read_from_the_assigned_flag():
+    flag = Flag.model_validate(
+        {
+            "key": "bandit-flag",
+            "enabled": True,
+            "variationType": "STRING",
+            "variations": {"banner": {"key": "banner", "value": "banner_bandit"}},
+            "allocations": [
+                {
+                    "key": "everyone",
+                    "splits": [{"variationKey": "banner", "shards": []}],
+                }
+            ],
+            "totalShards": 10000,
+        }
+    )
+    requestor = Mock()
+    # a new configuration, without the bandit, is stored after the assignment
+    requestor.get_configuration.side_effect = [
+        compile_flag(flag, {"banner_bandit": "banner_bandit"}),
+        compile_flag(flag),
+    ]
+    requestor.get_bandit_model.return_value = None
+    client = EppoClient(
+        config_requestor=requestor,
+        assignment_logger=AssignmentLogger(),
+        poll_interval_seconds=None,
+    )
+
+    result = client.get_bandit_action("bandit-flag", "alice", {}, {"nike": {}}, "")
+
+    assert result.variation == "banner_bandit"
+    requestor.get_bandit_model.assert_called_once_with("banner_bandit")
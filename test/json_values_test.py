@@ -0,0 +1,23 @@
+import pytest
+
+from eppo_client.json_values import parse_json_value
+
+
+def test_parse_json_value():
+    json_value = parse_json_value('{"layout": [{"id": 1, "visible": true}], "x": null}')
+    expected = {"layout": [{"id": 1, "visible": True}], "x": None}
+
+    first_copy = json_value.copy()
+    assert first_copy == expected
+    first_copy["layout"].append("changed")
+    assert json_value.copy() == expected
+
+    assert json_value.view["layout"][0]["visible"] is True
+    assert json_value.view["layout"] == ({"id": 1, "visible": True},)
+    with pytest.raises(TypeError):
+        json_value.view["x"] = 1
+
+
+def test_parse_invalid_json_value():
+    with pytest.raises(ValueError):
+        parse_json_value("{not json")
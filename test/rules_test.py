@@ -2,8 +2,11 @@ from eppo_client.rules import (
     OperatorType,
     Rule,
     Condition,
+    SubjectAttributesView,
+    compile_condition,
     evaluate_condition,
     matches_rule,
+    parse_subject_semver,
     to_string,
 )
 
@@ -427,3 +430,66 @@ def test_to_string_bool():
 
 def test_to_string_null():
     assert to_string(None) == "null"
+
+
+def test_evaluate_condition_invalid_regex(caplog):
+    invalid_matches_condition = Condition(
+        operator=OperatorType.MATCHES, value="[", attribute="email"
+    )
+    compiled_condition = compile_condition(invalid_matches_condition)
+    assert "Invalid regular expression" in caplog.text
+    assert not compiled_condition.matches({"email": "["})
+
+    invalid_not_matches_condition = Condition(
+        operator=OperatorType.NOT_MATCHES, value="(", attribute="email"
+    )
+    assert not evaluate_condition(invalid_not_matches_condition, {"email": "test"})
+
+
+def test_evaluate_condition_one_of_large_list():
+    user_ids = [f"user-{i}" for i in range(5000)]
+    one_of_condition = compile_condition(
+        Condition(operator=OperatorType.ONE_OF, value=user_ids, attribute="id")
+    )
+    not_one_of_condition = compile_condition(
+        Condition(operator=OperatorType.NOT_ONE_OF, value=user_ids, attribute="id")
+    )
+    assert one_of_condition.matches({"id": "user-4999"})
+    assert not one_of_condition.matches({"id": "user-5000"})
+    assert not not_one_of_condition.matches({"id": "user-0"})
+    assert not_one_of_condition.matches({"id": "user-5000"})
+
+
+def test_evaluate_condition_semver_parses_subject_version_once():
+    parse_subject_semver.cache_clear()
+    condition = compile_condition(
+        Condition(operator=OperatorType.GTE, value="1.2.0", attribute="app_version")
+    )
+    assert condition.matches({"app_version": "1.10.0"})
+    assert condition.matches({"app_version": "1.10.0"})
+    assert not condition.matches({"app_version": "1.1.9"})
+    assert not condition.matches({"app_version": "not-a-version"})
+
+    cache_info = parse_subject_semver.cache_info()
+    assert cache_info.misses == 3
+    assert cache_info.hits == 1
+
+
+def test_subject_attributes_view():
+    subject_attributes = {"email": "test@example.com", "age": None}
+    view = SubjectAttributesView("subject-1", subject_attributes)
+    assert view.get("id") == "subject-1"
+    assert view.get("email") == "test@example.com"
+    assert view.get("age", "default") is None
+    assert view.get("missing") is None
+    assert dict(view) == {"id": "subject-1", **subject_attributes}
+
+    view = SubjectAttributesView("subject-1", {"id": "do-not-overwrite-me"})
+    assert view["id"] == "do-not-overwrite-me"
+    assert len(view) == 1
+
+    view = SubjectAttributesView("subject-1", {"age": 30.0, "beta": True})
+    assert view.get_string("age") == "30"
+    assert view.get_string("beta") == "true"
+    assert view.get_string("id") == "subject-1"
+    assert view.get_string("missing") is None